@@ -0,0 +1,113 @@
+# auth/dependencies.py
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+
+from auth.auth_utils import decode_access_token
+from core.metrics import span
+from core.settings import TOKEN_CACHE_MAX_ENTRIES, TOKEN_CACHE_TTL_S
+from services.admission import admission
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+
+def user_dir_for(email: str) -> str:
+    """Sanitized per-user folder name used under ml_models/ and data/ (bilal@yahoo.com -> bilal_yahoo)."""
+    return email.replace("@", "_").replace(".com", "")
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    email: str
+    user_dir: str
+    claims: dict
+
+
+class TokenCache:
+    """Bounded LRU of verified token claims, keyed by SHA-256 of the token.
+
+    An entry lives for at most ``ttl_s`` seconds and never past the token's own ``exp``.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES, ttl_s: float = TOKEN_CACHE_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            user, expires_at = entry
+            if time.time() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return user
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, user: CurrentUser):
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl_s
+        exp = user.claims.get("exp")
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        key = self._key(token)
+        self._entries[key] = (user, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache()
+
+
+async def current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """Resolve the bearer token to the calling user, verifying its signature at most once per TTL."""
+    with span("auth.token_cache"):
+        user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    with span("auth.token_decode"):
+        payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    user = CurrentUser(email=payload["sub"], user_dir=user_dir_for(payload["sub"]), claims=payload)
+    token_cache.put(token, user)
+    return user
+
+
+async def admitted_user(user: CurrentUser = Depends(current_user)):
+    """``current_user`` plus per-user admission control; over-limit requests get 429 with Retry-After."""
+    with span("auth.admission"):
+        retry_after = admission.try_acquire(user.user_dir)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests for this user, retry later",
+            headers={"Retry-After": admission.retry_after_header(retry_after)},
+        )
+    try:
+        yield user
+    finally:
+        admission.release(user.user_dir)
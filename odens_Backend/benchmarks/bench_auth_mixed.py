@@ -0,0 +1,81 @@
+# benchmarks/bench_auth_mixed.py
+"""Login throughput and prediction latency while a login burst is in progress.
+
+    python -m benchmarks.bench_auth_mixed --logins 200 --concurrency 32
+
+Runs the app in-process over ASGI. Prediction latency is measured once with no
+login traffic and once while the login burst runs; with bcrypt offloaded to its
+own pool the two should stay close. Tune ODENS_BCRYPT_ROUNDS / ODENS_AUTH_HASH_WORKERS
+to see their effect.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import SAMPLE_QUOTE, summarize, use_temp_model_dir
+
+
+async def _predict_loop(client, headers, stop: asyncio.Event, latencies: list, max_requests: int = None):
+    while not stop.is_set() and (max_requests is None or len(latencies) < max_requests):
+        start = time.perf_counter()
+        resp = await client.post("/predict/model_latest", json=SAMPLE_QUOTE, headers=headers)
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def _login_burst(client, n: int, concurrency: int, latencies: list):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            resp = await client.post("/auth/login", data={"username": "bench@odens.com", "password": "bench-password"})
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+
+
+async def run(args):
+    import httpx
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            resp = await client.post("/auth/signup", data={"username": "bench@odens.com", "password": "bench-password"})
+            headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+            idle = []
+            start = time.perf_counter()
+            await _predict_loop(client, headers, asyncio.Event(), idle, max_requests=args.predictions)
+            idle_summary = summarize(idle, time.perf_counter() - start)
+
+            logins, under_load = [], []
+            stop = asyncio.Event()
+            predictor = asyncio.create_task(_predict_loop(client, headers, stop, under_load))
+            start = time.perf_counter()
+            await _login_burst(client, args.logins, args.concurrency, logins)
+            login_elapsed = time.perf_counter() - start
+            stop.set()
+            await predictor
+            loaded_summary = summarize(under_load, login_elapsed)
+
+    print(f"logins:                  {summarize(logins, login_elapsed)}")
+    print(f"predict (no logins):     {idle_summary}")
+    print(f"predict (during logins): {loaded_summary}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--predictions", type=int, default=200, help="Requests in the no-login baseline")
+    args = parser.parse_args()
+
+    use_temp_model_dir()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
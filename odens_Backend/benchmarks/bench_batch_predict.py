@@ -0,0 +1,41 @@
+# benchmarks/bench_batch_predict.py
+"""Compare pricing N quotes via N /predict/model_latest calls vs one /predict/batch call.
+
+    python -m benchmarks.bench_batch_predict --rows 1 100 10000
+"""
+import argparse
+
+from benchmarks.common import Timer, auth_headers, sample_quotes, use_temp_model_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10000])
+    args = parser.parse_args()
+
+    use_temp_model_dir()
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        headers = auth_headers(client)
+        client.post("/predict/model_latest", json=sample_quotes(1)[0], headers=headers)  # warm registry
+
+        print(f"{'rows':>8} {'per-row (s)':>12} {'batch (s)':>10} {'speedup':>8}")
+        for n in args.rows:
+            quotes = sample_quotes(n)
+
+            with Timer() as per_row:
+                single = [
+                    client.post("/predict/model_latest", json=q, headers=headers).json()["predicted_price_sek"]
+                    for q in quotes
+                ]
+            with Timer() as batch:
+                batched = client.post("/predict/batch", json=quotes, headers=headers).json()["predicted_prices_sek"]
+
+            assert single == batched, "batch and per-row predictions differ"
+            print(f"{n:>8} {per_row.elapsed:>12.4f} {batch.elapsed:>10.4f} {per_row.elapsed / batch.elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
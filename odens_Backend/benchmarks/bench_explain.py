@@ -0,0 +1,48 @@
+# benchmarks/bench_explain.py
+"""Explanations per second: one quote per pred_contribs call vs batched calls, plus cached endpoint hits.
+
+    python -m benchmarks.bench_explain --rows 1 100 10000
+"""
+import argparse
+
+from benchmarks.common import BENCH_USER_DIR, Timer, auth_headers, sample_quotes, use_temp_model_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--single-calls", type=int, default=500, help="Quotes explained one call at a time")
+    args = parser.parse_args()
+
+    use_temp_model_dir()
+    from fastapi.testclient import TestClient
+    from main import app
+    from services.explainer import explain_features, explainer
+    from services.model_registry import model_registry
+
+    with TestClient(app) as client:
+        headers = auth_headers(client)
+        loaded = model_registry.get(BENCH_USER_DIR)
+        quotes = sample_quotes(max(args.rows + [args.single_calls]))
+
+        with Timer() as single:
+            for quote in quotes[: args.single_calls]:
+                explain_features(loaded, loaded.encoder.encode([quote]))
+        print(f"{'single':>8} {args.single_calls / single.elapsed:>12.0f} explanations/s")
+
+        for n in args.rows:
+            features = loaded.encoder.encode(quotes[:n])
+            with Timer() as batch:
+                explain_features(loaded, features)
+            print(f"{'batch':>8} {n:>6} rows {n / batch.elapsed:>12.0f} explanations/s")
+
+        explainer.cache.clear()
+        for label in ("cold", "cached"):
+            with Timer() as http:
+                for quote in quotes[: args.single_calls]:
+                    client.post("/predict/explain", json=quote, headers=headers).raise_for_status()
+            print(f"{'endpoint':>8} {label:>6} {args.single_calls / http.elapsed:>12.0f} explanations/s")
+
+
+if __name__ == "__main__":
+    main()
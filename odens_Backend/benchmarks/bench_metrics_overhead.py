@@ -0,0 +1,21 @@
+# benchmarks/bench_metrics_overhead.py
+"""Per-call cost of ``with span(...)`` with metrics enabled and disabled.
+
+    python -m benchmarks.bench_metrics_overhead
+"""
+import timeit
+
+
+def main():
+    import core.metrics as metrics
+
+    n = 1_000_000
+    baseline = timeit.timeit("pass", number=n)
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        elapsed = timeit.timeit("with span('bench'):\n    pass", globals={"span": metrics.span}, number=n)
+        print(f"enabled={enabled!s:<5} {(elapsed - baseline) / n * 1e9:8.1f} ns per span")
+
+
+if __name__ == "__main__":
+    main()
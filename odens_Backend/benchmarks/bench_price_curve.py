@@ -0,0 +1,51 @@
+# benchmarks/bench_price_curve.py
+"""Latency of /predict/price_curve for growing grids, end-to-end and for the encode+predict core.
+
+    python -m benchmarks.bench_price_curve --grids 10x10 100x100 200x250
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import SAMPLE_QUOTE, Timer, auth_headers, summarize, use_temp_model_dir, BENCH_USER_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--grids", nargs="+", default=["10x10", "100x100", "200x250"], help="QTYxRAW grid sizes")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temp_model_dir()
+    from fastapi.testclient import TestClient
+    from main import app
+    from services.model_registry import model_registry
+
+    with TestClient(app) as client:
+        headers = auth_headers(client)
+        loaded = model_registry.get(BENCH_USER_DIR)
+
+        for grid in args.grids:
+            n_qty, n_raw = (int(x) for x in grid.split("x"))
+            body = {
+                "base": SAMPLE_QUOTE,
+                "quantities": np.linspace(10_000, 500_000, n_qty).astype(int).tolist(),
+                "raw_material_prices_eur_kg": np.linspace(1.5, 4.0, n_raw).round(3).tolist(),
+            }
+            grid_axes = {"quantity": body["quantities"], "raw_material_price_eur_kg": body["raw_material_prices_eur_kg"]}
+
+            core, http = [], []
+            for _ in range(args.repeat):
+                with Timer() as t:
+                    loaded.model.predict(loaded.encoder.encode_grid(SAMPLE_QUOTE, grid_axes))
+                core.append(t.elapsed)
+                with Timer() as t:
+                    client.post("/predict/price_curve", json=body, headers=headers).raise_for_status()
+                http.append(t.elapsed)
+
+            print(f"{grid:>9} ({n_qty * n_raw:>6} pts)  core p50 {summarize(core, sum(core))['p50_ms']:>8.2f} ms"
+                  f"  endpoint p50 {summarize(http, sum(http))['p50_ms']:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_user_store.py
+"""Lookups per second against the SQLite user store.
+
+    python -m benchmarks.bench_user_store --users 100000 --lookups 200000 --threads 1 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    os.environ["ODENS_USER_DB_PATH"] = str(Path(tempfile.mkdtemp(prefix="odens-bench-")) / "users.db")
+    from database import users
+
+    conn = users.get_connection()
+    start = time.perf_counter()
+    conn.execute("BEGIN")
+    conn.executemany(
+        users._INSERT_USER,
+        ((f"user{i}@bench.com", "$2b$12$" + "x" * 53) for i in range(args.users)),
+    )
+    conn.execute("COMMIT")
+    print(f"seeded {args.users} users in {time.perf_counter() - start:.2f}s")
+
+    for n_threads in args.threads:
+        per_thread = args.lookups // n_threads
+        rng = random.Random(42)
+        emails = [f"user{rng.randrange(args.users)}@bench.com" for _ in range(per_thread)]
+
+        def worker():
+            for email in emails:
+                assert users.get_user(email) is not None
+
+        threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        total = per_thread * n_threads
+        print(f"threads={n_threads:<3} lookups={total:<8} {total / elapsed:>10.0f} lookups/s")
+
+    start = time.perf_counter()
+    misses = sum(users.get_user(f"missing{i}@bench.com") is None for i in range(50_000))
+    print(f"miss lookups: {misses / (time.perf_counter() - start):.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
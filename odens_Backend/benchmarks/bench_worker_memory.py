@@ -0,0 +1,153 @@
+# benchmarks/bench_worker_memory.py
+"""Resident memory per gunicorn worker with many tenant models, with and without pre-fork model loading.
+
+    python -m benchmarks.bench_worker_memory                          # 1, 4, 16 workers x 1000 tenants, both modes
+    python -m benchmarks.bench_worker_memory --workers 4 --tenants 200 --modes preload
+
+Every tenant gets a copy of the sample model. Modes:
+  preload     models are parsed once in the gunicorn master and inherited by the workers (the default)
+  per_worker  ODENS_MODEL_PRELOAD_BEFORE_FORK=0: every worker parses every model in its own warm-up
+
+Workers warm up with one dummy prediction per model before they accept requests, so the
+numbers include whatever pages inference touches. Memory is read from /proc/<pid>/smaps_rollup:
+RSS counts shared pages in every process, PSS splits them between the processes sharing them
+and USS is memory private to the process; total PSS is what the node actually pays.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.common import BENCH_USER_DIR, use_temp_model_dir
+from benchmarks.load_test import RESULTS_DIR, _free_port, _git_commit
+
+MODES = ("preload", "per_worker")
+
+
+def make_tenants(model_dir: Path, n: int):
+    sample = model_dir / BENCH_USER_DIR
+    for i in range(n):
+        shutil.copytree(sample, model_dir / f"tenant{i:04d}_bench")
+
+
+def memory_kb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[key] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def worker_pids(master_pid: int) -> list:
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def wait_until_settled(proc, port: int, n_workers: int, timeout_s: float):
+    """Wait for every worker to be up and for total memory to stop growing."""
+    import httpx
+
+    deadline = time.monotonic() + timeout_s
+    streak = 0
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+        while streak < 4 * n_workers:
+            if time.monotonic() > deadline or proc.poll() is not None:
+                raise RuntimeError("gunicorn did not become ready")
+            try:
+                ok = client.get("/health/ready").status_code == 200
+            except httpx.TransportError:
+                ok = False
+            streak = streak + 1 if ok and len(worker_pids(proc.pid)) == n_workers else 0
+            time.sleep(0.05)
+
+    previous = None
+    while time.monotonic() < deadline:
+        total = sum(memory_kb(pid)["pss"] for pid in [proc.pid, *worker_pids(proc.pid)])
+        if previous is not None and abs(total - previous) <= 0.005 * previous:
+            return
+        previous = total
+        time.sleep(1.0)
+    raise RuntimeError("worker memory did not settle")
+
+
+def measure(mode: str, n_workers: int, timeout_s: float) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "ODENS_BIND": f"127.0.0.1:{port}",
+        "ODENS_WORKERS": str(n_workers),
+        "ODENS_MODEL_PRELOAD_BEFORE_FORK": "1" if mode == "preload" else "0",
+        "ODENS_MODEL_WARMUP_ON_STARTUP": "1",
+        "ODENS_MODEL_WARMUP_BLOCKING": "1",
+        "ODENS_WORKER_TIMEOUT_S": str(int(timeout_s)),
+    }
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "--log-level", "warning", "main:app"]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env)
+    try:
+        wait_until_settled(proc, port, n_workers, timeout_s)
+        ready_s = time.perf_counter() - started
+        master = memory_kb(proc.pid)
+        workers = [memory_kb(pid) for pid in worker_pids(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+
+    def mean_mb(key):
+        return round(sum(w[key] for w in workers) / len(workers) / 1024, 1)
+
+    return {
+        "mode": mode,
+        "workers": n_workers,
+        "ready_s": round(ready_s, 1),
+        "master_rss_mb": round(master["rss"] / 1024, 1),
+        "worker_rss_mb": mean_mb("rss"),
+        "worker_pss_mb": mean_mb("pss"),
+        "worker_uss_mb": mean_mb("uss"),
+        "total_pss_mb": round((master["pss"] + sum(w["pss"] for w in workers)) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds to wait for a configuration to settle")
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/<time>-<commit>-memory.json)")
+    args = parser.parse_args()
+
+    root = use_temp_model_dir()
+    make_tenants(root / "ml_models", args.tenants)
+    print(f"{args.tenants} tenant models + {BENCH_USER_DIR}")
+    print(f"{'mode':<11} {'workers':>7} {'ready s':>8} {'master RSS':>11} {'worker RSS':>11} "
+          f"{'worker PSS':>11} {'worker USS':>11} {'total PSS':>10}")
+
+    results = []
+    for mode in args.modes:
+        for n_workers in args.workers:
+            r = measure(mode, n_workers, args.timeout)
+            results.append(r)
+            print(f"{mode:<11} {n_workers:>7} {r['ready_s']:>8} {r['master_rss_mb']:>9} MB {r['worker_rss_mb']:>8} MB "
+                  f"{r['worker_pss_mb']:>8} MB {r['worker_uss_mb']:>8} MB {r['total_pss_mb']:>7} MB", flush=True)
+
+    commit = _git_commit()
+    output = args.output or RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{commit}-memory.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"git_commit": commit, "tenants": args.tenants, "results": results}, indent=2))
+    print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
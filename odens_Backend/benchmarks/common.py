@@ -0,0 +1,88 @@
+# benchmarks/common.py
+"""Shared helpers for the in-process backend benchmarks.
+
+Run benchmarks from the odens_Backend directory, e.g. ``python -m benchmarks.bench_batch_predict``.
+"""
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+SAMPLE_MODEL_DIR = Path("ml_models/bilal")
+BENCH_EMAIL = "bench@odens.com"
+BENCH_USER_DIR = "bench_odens"
+
+SAMPLE_QUOTE = {
+    "weight_kg_m": 1.288,
+    "length_m": 24.6,
+    "quantity": 50000,
+    "raw_material_price_eur_kg": 3.3,
+    "surface_treatment": "EN-AW-6063-T5",
+    "alloy": "Rå",
+    "profile_ref": "Hörnvinkel",
+}
+
+
+def use_temp_model_dir() -> Path:
+    """Point the backend at throwaway model, data and user-store locations, with the sample model for the bench user.
+
+    Also switches off per-user admission control, since the benchmarks drive a single user far past
+    its default rate limit; set ODENS_ADMISSION_ENABLED=1 to measure with it. Must be called before
+    ``main`` is imported, since settings are read at import time.
+    """
+    root = Path(tempfile.mkdtemp(prefix="odens-bench-"))
+    shutil.copytree(SAMPLE_MODEL_DIR, root / "ml_models" / BENCH_USER_DIR)
+    os.environ["ODENS_MODEL_DIR"] = str(root / "ml_models")
+    os.environ["ODENS_DATA_DIR"] = str(root / "data")
+    os.environ["ODENS_USER_DB_PATH"] = str(root / "data" / "users.db")
+    os.environ.setdefault("ODENS_ADMISSION_ENABLED", "0")
+    return root
+
+
+def auth_headers(client, email: str = BENCH_EMAIL, password: str = "bench-password") -> dict:
+    resp = client.post("/auth/signup", data={"username": email, "password": password})
+    if resp.status_code == 400:
+        resp = client.post("/auth/login", data={"username": email, "password": password})
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def sample_quotes(n: int) -> list:
+    """Deterministic variations of SAMPLE_QUOTE so rows are not all identical."""
+    return [
+        {**SAMPLE_QUOTE, "quantity": 20000 + (i % 180) * 1000, "length_m": 20 + (i % 9)}
+        for i in range(n)
+    ]
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(latencies_s: list, elapsed_s: float) -> dict:
+    """Throughput and latency percentiles (ms) for a list of per-call latencies in seconds."""
+    ms = [x * 1000 for x in latencies_s]
+    return {
+        "count": len(ms),
+        "elapsed_s": round(elapsed_s, 4),
+        "req_per_s": round(len(ms) / elapsed_s, 1) if elapsed_s else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
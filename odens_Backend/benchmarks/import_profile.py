@@ -0,0 +1,102 @@
+# benchmarks/import_profile.py
+"""Cold-start profile: per-module import cost of ``main`` and time to the first /health response.
+
+    python -m benchmarks.import_profile                    # import table + time-to-first-/health
+    python -m benchmarks.import_profile --top 30 --runs 5
+    python -m benchmarks.import_profile --target-ms 1500   # exit 1 if the median exceeds the target
+
+Import costs come from ``python -X importtime -c "import main"`` in a fresh interpreter,
+summed per top-level package (self time), so a heavy dependency sneaking back into the
+startup path shows up as its own row. Time to first /health is measured from spawning
+uvicorn until ``GET /health/`` returns 200; /health/ready (model warm-up) is reported
+alongside it but is not part of the target.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.common import use_temp_model_dir
+from benchmarks.load_test import _free_port
+
+# Packages that must stay off the import path of main (loaded lazily or during warm-up)
+HEAVY_PACKAGES = ("numpy", "pandas", "xgboost", "sklearn", "scipy", "pyarrow")
+
+
+def import_profile() -> tuple:
+    """Return ({top-level package: self microseconds}, total microseconds) for ``import main``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True, check=True
+    )
+    per_package = defaultdict(int)
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        per_package[name.split(".")[0]] += int(self_us)
+        if name == "main":
+            total = int(cumulative_us)
+    return dict(per_package), total
+
+
+def time_to_first_health(timeout_s: float = 60.0) -> tuple:
+    """Spawn uvicorn and return seconds until /health/ and /health/ready first answer 200."""
+    import httpx
+
+    port = _free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd)
+    health_s = ready_s = None
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            while ready_s is None:
+                if time.perf_counter() - started > timeout_s or proc.poll() is not None:
+                    raise RuntimeError("uvicorn did not become ready")
+                try:
+                    if health_s is None and client.get("/health/").status_code == 200:
+                        health_s = time.perf_counter() - started
+                    if health_s is not None and client.get("/health/ready").status_code == 200:
+                        ready_s = time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return health_s, ready_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="Packages to show in the import table")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure")
+    parser.add_argument("--target-ms", type=float, help="Fail if the median time to first /health exceeds this")
+    args = parser.parse_args()
+
+    use_temp_model_dir()
+
+    per_package, total_us = import_profile()
+    print(f"import main: {total_us / 1000:.1f} ms")
+    print(f"{'package':<28} {'self ms':>9} {'share':>7}")
+    for name, self_us in sorted(per_package.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"{name:<28} {self_us / 1000:>9.1f} {self_us / max(total_us, 1):>7.1%}")
+    eager = [name for name in HEAVY_PACKAGES if name in per_package]
+    print(f"heavy packages imported by main: {', '.join(eager) or 'none'}")
+
+    health, ready = zip(*(time_to_first_health() for _ in range(args.runs)))
+    health_ms = statistics.median(health) * 1000
+    print(f"\ntime to first /health:  median {health_ms:.0f} ms (min {min(health) * 1000:.0f}, max {max(health) * 1000:.0f})")
+    print(f"time to /health/ready:  median {statistics.median(ready) * 1000:.0f} ms")
+
+    if args.target_ms is not None:
+        ok = health_ms <= args.target_ms
+        print(f"target {args.target_ms:.0f} ms: {'met' if ok else 'MISSED'}")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# benchmarks/load_test.py
+"""Load-test scenarios for the backend, in-process (ASGI, no network) or against a local uvicorn.
+
+    python -m benchmarks.load_test                                # in-process, all scenarios
+    python -m benchmarks.load_test --target uvicorn --workers 4   # spawn uvicorn on a free port
+    python -m benchmarks.load_test --scenarios predict_single save_quote --requests 5000
+    python -m benchmarks.load_test --compare benchmarks/results/<older>.json
+
+Each run reports req/s and p50/p95/p99 latency per scenario and is saved as JSON under
+benchmarks/results/ (named by UTC time and git commit), so runs on different commits can
+be compared with ``--compare``.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.common import sample_quotes, summarize, use_temp_model_dir
+
+RESULTS_DIR = Path("benchmarks/results")
+SCENARIOS = ("signup_burst", "login_burst", "predict_single", "predict_batch", "save_quote")
+# bcrypt makes auth requests ~1000x more expensive than predictions, so they get fewer requests
+AUTH_SCENARIOS = ("signup_burst", "login_burst")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def _signup(client, i, ctx):
+    return await client.post(
+        "/auth/signup", data={"username": f"load-{ctx['run_id']}-{i}@bench.com", "password": "bench-password"}
+    )
+
+
+async def _login(client, i, ctx):
+    return await client.post("/auth/login", data={"username": "bench@odens.com", "password": "bench-password"})
+
+
+async def _predict_single(client, i, ctx):
+    quotes = ctx["quotes"]
+    return await client.post("/predict/model_latest", json=quotes[i % len(quotes)], headers=ctx["headers"])
+
+
+async def _predict_batch(client, i, ctx):
+    return await client.post("/predict/batch", json=ctx["batch"], headers=ctx["headers"])
+
+
+async def _save_quote(client, i, ctx):
+    quotes = ctx["quotes"]
+    row = {**quotes[i % len(quotes)], "quoted_price_sek": 3.0}
+    return await client.post("/predict/save_quote", json=row, headers=ctx["headers"])
+
+
+SCENARIO_FUNCS = {
+    "signup_burst": _signup,
+    "login_burst": _login,
+    "predict_single": _predict_single,
+    "predict_batch": _predict_batch,
+    "save_quote": _save_quote,
+}
+
+
+async def run_scenario(client, func, n_requests: int, concurrency: int, ctx: dict) -> dict:
+    latencies, errors = [], 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with sem:
+            start = time.perf_counter()
+            resp = await func(client, i, ctx)
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    summary = summarize(latencies, time.perf_counter() - start)
+    summary["errors"] = errors
+    return summary
+
+
+async def run_all(client, args) -> dict:
+    # Prediction/save scenarios all reuse one account.
+    resp = await client.post("/auth/signup", data={"username": "bench@odens.com", "password": "bench-password"})
+    if resp.status_code == 400:
+        resp = await client.post("/auth/login", data={"username": "bench@odens.com", "password": "bench-password"})
+    resp.raise_for_status()
+    ctx = {
+        "run_id": int(time.time()),
+        "headers": {"Authorization": f"Bearer {resp.json()['access_token']}"},
+        "quotes": sample_quotes(1000),
+        "batch": sample_quotes(args.batch_size),
+    }
+    # Warm the model registry so the first scenario does not pay the model load.
+    await client.post("/predict/model_latest", json=ctx["quotes"][0], headers=ctx["headers"])
+
+    results = {}
+    for name in args.scenarios:
+        n = args.auth_requests if name in AUTH_SCENARIOS else args.requests
+        if name == "predict_batch":
+            n = max(1, n // args.batch_size)
+        results[name] = await run_scenario(client, SCENARIO_FUNCS[name], n, args.concurrency, ctx)
+        print(f"{name:<16} {results[name]}")
+    return results
+
+
+async def run_asgi(args) -> dict:
+    import httpx
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            return await run_all(client, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_uvicorn(args) -> dict:
+    import httpx
+
+    port = _free_port()
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/health/")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    raise RuntimeError("uvicorn did not become ready")
+                await asyncio.sleep(0.1)
+            return await run_all(client, args)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def compare(current: dict, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nvs {baseline_path.name} ({baseline['git_commit']}):")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        rps = (now["req_per_s"] / before["req_per_s"] - 1) * 100 if before["req_per_s"] else 0.0
+        p99 = (now["p99_ms"] / before["p99_ms"] - 1) * 100 if before["p99_ms"] else 0.0
+        print(f"  {name:<16} req/s {rps:+6.1f}%   p99 {p99:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (uvicorn target only)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per prediction/save scenario")
+    parser.add_argument("--auth-requests", type=int, default=50, help="Requests per signup/login scenario")
+    parser.add_argument("--batch-size", type=int, default=100, help="Quotes per /predict/batch request")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    use_temp_model_dir()
+    runner = run_asgi if args.target == "asgi" else run_uvicorn
+    results = asyncio.run(runner(args))
+
+    commit = _git_commit()
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "target": args.target,
+        "workers": args.workers if args.target == "uvicorn" else None,
+        "concurrency": args.concurrency,
+        "batch_size": args.batch_size,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{commit}-{args.target}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
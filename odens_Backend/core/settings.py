@@ -0,0 +1,84 @@
+# core/settings.py
+import os
+
+# --- Model registry ---
+MODEL_DIR = os.getenv("ODENS_MODEL_DIR", "ml_models")
+MODEL_REGISTRY_MAX_ENTRIES = int(os.getenv("ODENS_MODEL_REGISTRY_MAX_ENTRIES", "2048"))
+# Load and warm (one dummy predict) every deployed user model in the lifespan startup hook
+MODEL_WARMUP_ON_STARTUP = os.getenv("ODENS_MODEL_WARMUP_ON_STARTUP", "1") == "1"
+# Hold startup until warm-up finishes; by default it runs in the background and /health/ready reports it
+MODEL_WARMUP_BLOCKING = os.getenv("ODENS_MODEL_WARMUP_BLOCKING", "0") == "1"
+# Under gunicorn (gunicorn_conf.py): load every deployed model in the master before forking,
+# so workers share the parsed boosters copy-on-write instead of each holding its own copy
+MODEL_PRELOAD_BEFORE_FORK = os.getenv("ODENS_MODEL_PRELOAD_BEFORE_FORK", "1") == "1"
+
+# --- Prediction ---
+PREDICT_BATCH_MAX_ITEMS = int(os.getenv("ODENS_PREDICT_BATCH_MAX_ITEMS", "50000"))
+PRICE_CURVE_MAX_POINTS = int(os.getenv("ODENS_PRICE_CURVE_MAX_POINTS", "250000"))
+# /predict/stream: rows validated and predicted per model call, and request bytes kept in RAM before spilling to disk
+STREAM_CHUNK_ROWS = int(os.getenv("ODENS_STREAM_CHUNK_ROWS", "2048"))
+STREAM_SPOOL_MAX_MEMORY_BYTES = int(os.getenv("ODENS_STREAM_SPOOL_MAX_MEMORY_BYTES", str(8 * 1024 * 1024)))
+
+# --- Micro-batching of concurrent /predict/model_latest calls ---
+PREDICT_BATCH_WINDOW_MS = float(os.getenv("ODENS_PREDICT_BATCH_WINDOW_MS", "2"))
+# A single user fills a batch only if ADMISSION_MAX_IN_FLIGHT (which defaults to this) is at least as large
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("ODENS_PREDICT_BATCH_MAX_SIZE", "64"))
+PREDICT_EXECUTOR_WORKERS = int(os.getenv("ODENS_PREDICT_EXECUTOR_WORKERS", "4"))
+
+# --- Saved quotes ---
+DATA_DIR = os.getenv("ODENS_DATA_DIR", "data")
+QUOTE_WRITER_FLUSH_ROWS = int(os.getenv("ODENS_QUOTE_WRITER_FLUSH_ROWS", "256"))
+QUOTE_WRITER_FLUSH_INTERVAL_MS = float(os.getenv("ODENS_QUOTE_WRITER_FLUSH_INTERVAL_MS", "200"))
+QUOTE_WRITER_FSYNC = os.getenv("ODENS_QUOTE_WRITER_FSYNC", "1") == "1"
+# "parquet" writes daily-partitioned Parquet files (database/quote_store.py), "csv" the legacy quotes_features.csv
+QUOTE_STORAGE = os.getenv("ODENS_QUOTE_STORAGE", "parquet")
+QUOTE_STORE_COMPACT_MIN_FILES = int(os.getenv("ODENS_QUOTE_STORE_COMPACT_MIN_FILES", "8"))
+
+# --- Background retraining from saved quotes ---
+RETRAIN_ENABLED = os.getenv("ODENS_RETRAIN_ENABLED", "1") == "1"
+# Queue a retrain once this many new quotes were saved for a user (0 disables the threshold)
+RETRAIN_MIN_NEW_ROWS = int(os.getenv("ODENS_RETRAIN_MIN_NEW_ROWS", "500"))
+# ...or once this long has passed since the last retrain and there is at least one new quote (0 disables)
+RETRAIN_INTERVAL_S = float(os.getenv("ODENS_RETRAIN_INTERVAL_S", "0"))
+# Users with fewer saved quotes than this are not retrained
+RETRAIN_MIN_TRAINING_ROWS = int(os.getenv("ODENS_RETRAIN_MIN_TRAINING_ROWS", "50"))
+# Encoded training set of the deployed model (data/{user}/<file>, the PriceAssistant's quotes_features.csv);
+# retraining fits on it plus the saved quotes
+RETRAIN_BASE_FEATURES_FILE = os.getenv("ODENS_RETRAIN_BASE_FEATURES_FILE", "training_features.csv")
+# A retrained model is activated only if no CV metric is worse than the current model's by more than this fraction
+RETRAIN_METRIC_TOLERANCE = float(os.getenv("ODENS_RETRAIN_METRIC_TOLERANCE", "0"))
+RETRAIN_WORKERS = int(os.getenv("ODENS_RETRAIN_WORKERS", "1"))
+RETRAIN_CHECK_INTERVAL_S = float(os.getenv("ODENS_RETRAIN_CHECK_INTERVAL_S", "30"))
+
+# --- Authentication ---
+BCRYPT_ROUNDS = int(os.getenv("ODENS_BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so a thread pool gives real parallelism; this caps concurrent hashes
+AUTH_HASH_WORKERS = int(os.getenv("ODENS_AUTH_HASH_WORKERS", "2"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("ODENS_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+TOKEN_CACHE_TTL_S = float(os.getenv("ODENS_TOKEN_CACHE_TTL_S", "300"))
+
+# --- User store ---
+USER_DB_PATH = os.getenv("ODENS_USER_DB_PATH", "data/users.db")
+
+# --- Admission control on /predict routes (per user, per worker) ---
+ADMISSION_ENABLED = os.getenv("ODENS_ADMISSION_ENABLED", "1") == "1"
+# Token bucket: sustained requests per second and burst size
+ADMISSION_RATE_PER_S = float(os.getenv("ODENS_ADMISSION_RATE_PER_S", "50"))
+ADMISSION_BURST = float(os.getenv("ODENS_ADMISSION_BURST", "100"))
+# Requests of one user being served at the same time. Defaults to PREDICT_BATCH_MAX_SIZE so one user's
+# concurrent calls can fill a micro-batch; lowering it protects other tenants but caps that user's batches
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ODENS_ADMISSION_MAX_IN_FLIGHT", str(PREDICT_BATCH_MAX_SIZE)))
+# Users whose limiter state is kept; the least recently seen idle user is dropped first
+ADMISSION_MAX_USERS = int(os.getenv("ODENS_ADMISSION_MAX_USERS", "10000"))
+
+# --- Prediction result cache ---
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("ODENS_PREDICTION_CACHE_MAX_ENTRIES", "100000"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("ODENS_PREDICTION_CACHE_TTL_S", "3600"))
+PREDICTION_CACHE_FLOAT_DECIMALS = int(os.getenv("ODENS_PREDICTION_CACHE_FLOAT_DECIMALS", "4"))
+
+# --- Price explanation cache (per-field TreeSHAP contributions) ---
+EXPLANATION_CACHE_MAX_ENTRIES = int(os.getenv("ODENS_EXPLANATION_CACHE_MAX_ENTRIES", "50000"))
+EXPLANATION_CACHE_TTL_S = float(os.getenv("ODENS_EXPLANATION_CACHE_TTL_S", "3600"))
+
+# --- Metrics ---
+METRICS_ENABLED = os.getenv("ODENS_METRICS_ENABLED", "1") == "1"
@@ -0,0 +1,242 @@
+# database/quote_store.py
+"""Partitioned Parquet storage for saved quotes.
+
+Layout (Hive-style partitions, one directory per UTC day the quotes were saved)::
+
+    data/{user_dir}/quotes/date=2025-06-01/part-<ns>-<rows>.parquet
+
+Every flush of the quote writer produces one small file; ``compact_partitions``
+merges them per day. Files are written under a hidden temporary name and renamed
+into place, so readers never see a partially written file. Compaction holds an
+exclusive ``flock`` on ``quotes/.lock`` and ``read_quotes`` a shared one, so a reader
+never sees a merged file together with its inputs. Each compaction also records its
+inputs in the partition's ``_compaction.json`` until they are deleted; after a crash
+readers skip those inputs and the next compaction removes them.
+
+Quotes saved before the switch to Parquet stay in the legacy
+``data/{user_dir}/quotes_features.csv``; ``read_quotes`` returns them ahead of the
+partitioned rows, with no ``saved_at``.
+
+Run compaction for every user with ``python -m database.quote_store compact``.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.settings import DATA_DIR, QUOTE_STORE_COMPACT_MIN_FILES
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development servers only
+    fcntl = None
+
+QUOTES_DIR = "quotes"
+PARTITION_KEY = "date"
+LEGACY_CSV = "quotes_features.csv"
+LOCK_FILE = ".lock"
+JOURNAL_FILE = "_compaction.json"
+
+# Typed columns matching schemas.quote_schema.QuoteWithTarget, plus the save time.
+QUOTE_SCHEMA = pa.schema([
+    ("weight_kg_m", pa.float64()),
+    ("length_m", pa.float64()),
+    ("quantity", pa.int64()),
+    ("raw_material_price_eur_kg", pa.float64()),
+    ("surface_treatment", pa.string()),
+    ("alloy", pa.string()),
+    ("profile_ref", pa.string()),
+    ("quoted_price_sek", pa.float64()),
+    ("saved_at", pa.timestamp("ms", tz="UTC")),
+])
+
+
+def quotes_root(user_dir: str, data_dir: str = DATA_DIR) -> Path:
+    return Path(data_dir) / user_dir / QUOTES_DIR
+
+
+def _partition_dir(root: Path, day: date) -> Path:
+    return root / f"{PARTITION_KEY}={day.isoformat()}"
+
+
+def _write_table(table: pa.Table, directory: Path, name: str, fsync: bool = True):
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = directory / f".{name}.tmp"
+    with open(tmp_path, "wb") as f:
+        pq.write_table(table, f, compression="zstd")
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, directory / name)
+
+
+def write_quotes(
+    user_dir: str,
+    rows: List[dict],
+    saved_at: datetime = None,
+    data_dir: str = DATA_DIR,
+    fsync: bool = True,
+) -> Path:
+    """Write one batch of saved quotes as a new file in today's partition."""
+    saved_at = saved_at or datetime.now(timezone.utc)
+    columns = {name: [row.get(name) for row in rows] for name in QUOTE_SCHEMA.names if name != "saved_at"}
+    columns["saved_at"] = [saved_at] * len(rows)
+    table = pa.table(columns, schema=QUOTE_SCHEMA)
+
+    directory = _partition_dir(quotes_root(user_dir, data_dir), saved_at.date())
+    name = f"part-{time.time_ns()}-{len(rows)}.parquet"
+    _write_table(table, directory, name, fsync=fsync)
+    return directory / name
+
+
+@contextmanager
+def _store_lock(root: Path, exclusive: bool):
+    """``flock`` on the user's ``quotes/.lock``: shared for readers, exclusive for compaction."""
+    if fcntl is None:
+        yield
+        return
+    with open(root / LOCK_FILE, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield  # released when the file is closed
+
+
+def _part_files(partition: Path) -> List[Path]:
+    return sorted(p for p in partition.glob("*.parquet") if not p.name.startswith("."))
+
+
+def _superseded(partition: Path) -> set:
+    """Names of the inputs of an interrupted compaction whose merged file was published."""
+    try:
+        entry = json.loads((partition / JOURNAL_FILE).read_text())
+    except FileNotFoundError:
+        return set()
+    return set(entry["inputs"]) if (partition / entry["merged"]).exists() else set()
+
+
+def _write_journal(partition: Path, merged: str, inputs: List[Path]):
+    tmp_path = partition / f".{JOURNAL_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"merged": merged, "inputs": [p.name for p in inputs]}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, partition / JOURNAL_FILE)
+
+
+def _finish_compaction(partition: Path):
+    """Delete the leftover inputs of a compaction that crashed after publishing its merged file."""
+    for name in _superseded(partition):
+        (partition / name).unlink(missing_ok=True)
+    (partition / JOURNAL_FILE).unlink(missing_ok=True)
+
+
+def compact_partitions(user_dir: str, min_files: int = QUOTE_STORE_COMPACT_MIN_FILES, data_dir: str = DATA_DIR) -> int:
+    """Merge the small files of each daily partition into one; returns the number of partitions compacted.
+
+    Safe to run while the backend is writing: only files that were listed and read are removed,
+    and new files appear atomically. Readers of this user wait until it is done, and a
+    second compaction waits for the first.
+    """
+    root = quotes_root(user_dir, data_dir)
+    if not root.exists():
+        return 0
+
+    compacted = 0
+    with _store_lock(root, exclusive=True):
+        for partition in sorted(p for p in root.iterdir() if p.is_dir()):
+            _finish_compaction(partition)
+            parts = _part_files(partition)
+            if len(parts) < max(min_files, 2):
+                continue
+            table = pa.concat_tables(pq.read_table(p, schema=QUOTE_SCHEMA) for p in parts)
+            merged = f"part-{time.time_ns()}-{table.num_rows}.parquet"
+            _write_journal(partition, merged, parts)
+            _write_table(table, partition, merged)
+            for p in parts:
+                p.unlink()
+            (partition / JOURNAL_FILE).unlink()
+            compacted += 1
+    return compacted
+
+
+def _read_legacy_csv(path: Path, schema: pa.Schema) -> pa.Table:
+    """The legacy CSV's rows typed as ``schema``; columns the CSV lacks are null."""
+    import pandas as pd
+
+    try:
+        frame = pd.read_csv(path, usecols=lambda name: name in schema.names, encoding="utf-8")
+    except UnicodeDecodeError:
+        # Older files were written with the platform default encoding (cp1252 on Windows)
+        frame = pd.read_csv(path, usecols=lambda name: name in schema.names, encoding="latin-1")
+    arrays = [
+        pa.array(frame[field.name], type=field.type, from_pandas=True) if field.name in frame
+        else pa.nulls(len(frame), type=field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def read_quotes(
+    user_dir: str,
+    columns: Optional[Iterable[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    data_dir: str = DATA_DIR,
+):
+    """Load saved quotes as a DataFrame, reading only ``columns`` and partitions in [start, end].
+
+    Rows of the legacy CSV have no save date; they are included unless ``start`` is given.
+    """
+    root = quotes_root(user_dir, data_dir)
+    columns = list(columns) if columns is not None else QUOTE_SCHEMA.names
+    schema = QUOTE_SCHEMA.append(pa.field(PARTITION_KEY, pa.string()))
+    selected = pa.schema([schema.field(name) for name in columns])
+
+    tables = []
+    legacy_csv = Path(data_dir) / user_dir / LEGACY_CSV
+    if start is None and legacy_csv.exists():
+        tables.append(_read_legacy_csv(legacy_csv, selected))
+    if root.exists():
+        with _store_lock(root, exclusive=False):
+            tables.append(_read_partitions(root, schema, columns, start, end))
+    if not tables:
+        return selected.empty_table().to_pandas()
+    return pa.concat_tables(tables).to_pandas()
+
+
+def _read_partitions(root: Path, schema: pa.Schema, columns: List[str], start, end) -> pa.Table:
+    # ISO dates compare correctly as strings, so whole partition directories are skipped by name.
+    first, last = start and start.isoformat(), end and end.isoformat()
+    files = []
+    for partition in sorted(p for p in root.iterdir() if p.is_dir()):
+        day = partition.name.partition("=")[2]
+        if (first and day < first) or (last and day > last):
+            continue
+        superseded = _superseded(partition)
+        files.extend(str(p) for p in _part_files(partition) if p.name not in superseded)
+    partitioning = ds.partitioning(pa.schema([schema.field(PARTITION_KEY)]), flavor="hive")
+    dataset = ds.dataset(files, schema=schema, format="parquet", partitioning=partitioning, partition_base_dir=str(root))
+    return dataset.to_table(columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain partitioned saved-quote storage.")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument("--user", help="Only this user directory (default: all users)")
+    parser.add_argument("--min-files", type=int, default=QUOTE_STORE_COMPACT_MIN_FILES)
+    args = parser.parse_args()
+
+    users = [args.user] if args.user else sorted(p.name for p in Path(DATA_DIR).iterdir() if (p / QUOTES_DIR).is_dir())
+    for user in users:
+        print(f"{user}: compacted {compact_partitions(user, args.min_files)} partition(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,61 @@
-# This is a simple mock DB. Replace with actual DB in production.
-users_db = {}
+# database/users.py
+# SQLite-backed user store. Each thread of each worker process keeps its own
+# connection, so multiple uvicorn workers can share one database file.
+import os
+import sqlite3
+import threading
+
+from core.settings import USER_DB_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    hashed_password TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID
+"""
+
+# Constant SQL text lets sqlite3's statement cache reuse the prepared statements.
+_SELECT_USER = "SELECT email, hashed_password FROM users WHERE email = ?"
+_INSERT_USER = "INSERT INTO users (email, hashed_password) VALUES (?, ?)"
+
+_local = threading.local()
+
+
+class UserAlreadyExistsError(Exception):
+    pass
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, isolation_level=None, cached_statements=32)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def get_connection() -> sqlite3.Connection:
+    """Connection for the current thread, reopened after a fork."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = _local.conn = _connect(USER_DB_PATH)
+        _local.pid = os.getpid()
+    return conn
+
 
 def get_user(email: str):
-    return users_db.get(email)
+    row = get_connection().execute(_SELECT_USER, (email,)).fetchone()
+    if row is None:
+        return None
+    return {"email": row[0], "hashed_password": row[1]}
+
 
 def create_user(email: str, hashed_password: str):
-    users_db[email] = {"email": email, "hashed_password": hashed_password}
-    return users_db[email]
+    try:
+        get_connection().execute(_INSERT_USER, (email, hashed_password))
+    except sqlite3.IntegrityError:
+        raise UserAlreadyExistsError(email)
+    return {"email": email, "hashed_password": hashed_password}
@@ -0,0 +1,36 @@
+# gunicorn_conf.py
+"""Multi-worker deployment: ``gunicorn -c gunicorn_conf.py main:app``.
+
+The app is imported once in the master (``preload_app``) and, with
+ODENS_MODEL_PRELOAD_BEFORE_FORK=1, every deployed model is parsed there before the
+workers are forked. Workers then share the boosters' memory copy-on-write, so N workers
+cost roughly one copy of the model bytes plus their own Python overhead. A model that is
+redeployed later is reloaded privately by each worker on its next request.
+"""
+import gc
+import os
+
+bind = os.getenv("ODENS_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("ODENS_WORKERS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("ODENS_WORKER_TIMEOUT_S", "120"))
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before any worker is forked."""
+    from core.settings import MODEL_PRELOAD_BEFORE_FORK
+    from services.model_registry import model_registry, preload_dependencies
+    from services.model_store import active_users
+
+    preload_dependencies()
+    if not MODEL_PRELOAD_BEFORE_FORK:
+        return
+    # Load only: a prediction here would start OpenMP threads that the forked workers cannot use
+    results = model_registry.warm_up(active_users(str(model_registry.model_dir)), predict=False)
+    failed = sum(str(v).startswith("error:") for v in results.values())
+    server.log.info("Preloaded %d models before fork (%d failed)", len(results) - failed, failed)
+    # Move everything allocated so far out of the GC's generations; otherwise each worker's first
+    # full collection writes to every object header and un-shares those pages
+    gc.collect()
+    gc.freeze()
@@ -1,7 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from routes import health, auth, user, predict
+from starlette.concurrency import run_in_threadpool
+from routes import health, auth, user, predict, metrics
+from core.settings import MODEL_WARMUP_BLOCKING, MODEL_WARMUP_ON_STARTUP
+from services.micro_batcher import micro_batcher
+from services.model_registry import model_registry, preload_dependencies
+from services.model_store import active_users
+from services.quote_writer import quote_writer
+from services.retrainer import retrainer
 
-app = FastAPI(title="Odens Pricing Backend")
+
+def warm_up() -> dict:
+    """Import numpy/xgboost and, if enabled, load and warm every deployed model."""
+    preload_dependencies()
+    if not MODEL_WARMUP_ON_STARTUP:
+        return {}
+    return model_registry.warm_up(active_users(str(model_registry.model_dir)))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    quote_writer.add_listener(retrainer.record_rows)
+    quote_writer.start()
+    retrainer.start()
+    # /health answers as soon as the routes are imported; /health/ready waits for this task
+    app.state.warmup = asyncio.create_task(run_in_threadpool(warm_up))
+    if MODEL_WARMUP_BLOCKING:
+        await app.state.warmup
+    yield
+    app.state.warmup.cancel()
+    micro_batcher.close()
+    quote_writer.close()
+    retrainer.close()
+
+
+app = FastAPI(title="Odens Pricing Backend", lifespan=lifespan)
 
 @app.get("/", summary="Welcome Message!")
 def welcome():
@@ -12,4 +46,5 @@ def welcome():
 app.include_router(health.router, prefix="/health", tags=["Health"])
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(user.router, prefix="/user", tags=["User"])
-app.include_router(predict.router, prefix="/predict", tags=["Prediction"]) 
+app.include_router(predict.router, prefix="/predict", tags=["Prediction"])
+app.include_router(metrics.router, tags=["Metrics"]) 
@@ -1,34 +1,50 @@
 # routes/auth.py
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from models.user import TokenResponse
-from auth.auth_utils import hash_password, verify_password, create_access_token
-from database.users import get_user, create_user
+from auth.auth_utils import hash_password_async, verify_password_async, create_access_token
+from database.users import get_user, create_user, UserAlreadyExistsError
+from core.metrics import span
 
 router = APIRouter()
 
 @router.post("/signup", response_model=TokenResponse)
-def signup(form_data: OAuth2PasswordRequestForm = Depends()):
+async def signup(form_data: OAuth2PasswordRequestForm = Depends()):
     user_email = form_data.username
     password = form_data.password
 
-    if get_user(user_email):
+    with span("signup.user_lookup"):
+        existing = await run_in_threadpool(get_user, user_email)
+    if existing:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed = hash_password(password)
-    create_user(user_email, hashed)
+    with span("signup.hash_password"):
+        hashed = await hash_password_async(password)
+    try:
+        with span("signup.user_create"):
+            await run_in_threadpool(create_user, user_email, hashed)
+    except UserAlreadyExistsError:
+        raise HTTPException(status_code=400, detail="User already exists")
 
-    token = create_access_token({"sub": user_email})
+    with span("signup.token_create"):
+        token = create_access_token({"sub": user_email})
     return {"access_token": token, "token_type": "bearer"}
 
 @router.post("/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     user_email = form_data.username
     password = form_data.password
 
-    db_user = get_user(user_email)
-    if not db_user or not verify_password(password, db_user["hashed_password"]):
+    with span("login.user_lookup"):
+        db_user = await run_in_threadpool(get_user, user_email)
+    valid = False
+    if db_user:
+        with span("login.verify_password"):
+            valid = await verify_password_async(password, db_user["hashed_password"])
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token({"sub": user_email})
+    with span("login.token_create"):
+        token = create_access_token({"sub": user_email})
     return {"access_token": token, "token_type": "bearer"}
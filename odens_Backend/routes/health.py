@@ -1,9 +1,28 @@
 # app/api/routes_health.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from core.metrics import collect_stats
 
 router = APIRouter()
 
 @router.get("/", summary="Health check")
 def health_check():
     return {"status": "ok", "message": "Backend is running"}
+
+
+@router.get("/ready", summary="Readiness check (503 until the startup warm-up has finished)")
+def readiness_check(request: Request):
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        return {"status": "ready", "models": {}}
+    if not warmup.done() or warmup.cancelled():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    if warmup.exception() is not None:
+        return JSONResponse(status_code=503, content={"status": "warm_up_failed", "detail": str(warmup.exception())})
+    return {"status": "ready", "models": warmup.result()}
+
+
+@router.get("/stats", summary="Full statistics of every component whose numeric fields /metrics exports")
+def component_stats():
+    return collect_stats()
@@ -0,0 +1,28 @@
+# routes/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from auth.dependencies import token_cache
+from core.metrics import register_stats, render
+from services.admission import admission
+from services.explainer import explainer
+from services.micro_batcher import micro_batcher
+from services.model_registry import model_registry
+from services.quote_writer import quote_writer
+from services.result_cache import prediction_cache
+from services.retrainer import retrainer
+
+router = APIRouter()
+
+register_stats("odens_model_registry", model_registry.stats)
+register_stats("odens_micro_batcher", micro_batcher.stats)
+register_stats("odens_quote_writer", quote_writer.stats)
+register_stats("odens_prediction_cache", prediction_cache.stats)
+register_stats("odens_explainer", explainer.stats)
+register_stats("odens_token_cache", token_cache.stats)
+register_stats("odens_admission", admission.stats)
+register_stats("odens_retrainer", retrainer.stats)
+
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -1,71 +1,198 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from auth.auth_utils import decode_access_token
-from schemas.quote_schema import QuoteML, QuoteWithTarget
-import pandas as pd
-import xgboost as xgb
-from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from auth.dependencies import CurrentUser, admitted_user, current_user
+from schemas.quote_schema import QuoteML, QuoteWithTarget, PriceCurveRequest
+from services.explainer import explainer
+from services.model_registry import model_registry
+from services.micro_batcher import micro_batcher
+from services.quote_writer import quote_writer
+from services.result_cache import canonicalize, prediction_cache
+from starlette.concurrency import run_in_threadpool
+from core.metrics import span
+from core.settings import (
+    PREDICT_BATCH_MAX_ITEMS,
+    PRICE_CURVE_MAX_POINTS,
+    STREAM_CHUNK_ROWS,
+    STREAM_SPOOL_MAX_MEMORY_BYTES,
+)
+from typing import List
 import json
-import csv
-import os
+import tempfile
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 @router.post("/model_latest", summary="Predict quote price using latest model")
-def predict_quote(data: QuoteML, token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+async def predict_quote(data: QuoteML, user: CurrentUser = Depends(admitted_user)):
+    try:
+        with span("model_latest.model_lookup"):
+            loaded = await run_in_threadpool(model_registry.get, user.user_dir)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No model found for this user")
+
+    with span("model_latest.cache_lookup"):
+        # Every route encodes the canonical form, so equal cache keys always mean equal model input
+        record = canonicalize(data.model_dump())
+        prediction = prediction_cache.get(user.user_dir, loaded.version, record)
+    if prediction is None:
+        with span("model_latest.encode"):
+            features = loaded.encoder.encode_row(record)
+        with span("model_latest.inference"):
+            prediction = await micro_batcher.predict(loaded, features)
+        prediction_cache.put(user.user_dir, loaded.version, record, prediction)
+
+    return {"predicted_price_sek": round(prediction, 2)}
 
-    user_email = payload["sub"]
-    user_dir = user_email.replace("@", "_").replace(".com", "")
 
-    model_path = Path(f"ml_models/{user_dir}/xgboost_model.json")
-    meta_path = Path(f"ml_models/{user_dir}/model_metadata.json")
+@router.post("/batch", summary="Predict prices for a list of quotes in one model call")
+def predict_batch(data: List[QuoteML], user: CurrentUser = Depends(admitted_user)):
+    if len(data) > PREDICT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {PREDICT_BATCH_MAX_ITEMS} items")
 
-    if not model_path.exists() or not meta_path.exists():
+    try:
+        with span("batch.model_lookup"):
+            loaded = model_registry.get(user.user_dir)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="No model found for this user")
 
-    model = xgb.XGBRegressor()
-    model.load_model(str(model_path))
+    if not data:
+        return {"predicted_prices_sek": []}
 
-    with open(meta_path, "r") as f:
-        meta = json.load(f)
+    with span("batch.encode"):
+        features = loaded.encoder.encode([canonicalize(item.model_dump()) for item in data])
+    with span("batch.inference"):
+        predictions = loaded.model.predict(features)
+    return {"predicted_prices_sek": [round(float(p), 2) for p in predictions]}
 
-    input_df = pd.DataFrame([data.dict()])
-    input_df = pd.get_dummies(input_df)
 
-    for col in meta["features_used"]:
-        if col not in input_df.columns:
-            input_df[col] = 0
-    input_df = input_df[meta["features_used"]]
+@router.post("/price_curve", summary="Price surface across quantity tiers and raw material prices")
+def predict_price_curve(data: PriceCurveRequest, user: CurrentUser = Depends(admitted_user)):
+    n_points = len(data.quantities) * len(data.raw_material_prices_eur_kg)
+    if n_points > PRICE_CURVE_MAX_POINTS:
+        raise HTTPException(status_code=413, detail=f"Grid exceeds {PRICE_CURVE_MAX_POINTS} points")
 
-    prediction = float(model.predict(input_df)[0])
-    return {"predicted_price_sek": round(prediction, 2)}
+    try:
+        with span("price_curve.model_lookup"):
+            loaded = model_registry.get(user.user_dir)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No model found for this user")
 
+    with span("price_curve.encode"):
+        features = loaded.encoder.encode_grid(
+            canonicalize(data.base.model_dump()),
+            {"quantity": data.quantities, "raw_material_price_eur_kg": data.raw_material_prices_eur_kg},
+        )
+    with span("price_curve.inference"):
+        predictions = loaded.model.predict(features)
+    surface = predictions.reshape(len(data.quantities), len(data.raw_material_prices_eur_kg))
+    return {
+        "quantities": data.quantities,
+        "raw_material_prices_eur_kg": data.raw_material_prices_eur_kg,
+        # predicted_prices_sek[i][j] is the price at quantities[i] and raw_material_prices_eur_kg[j]
+        # float32 .round(2) still prints as 3.130000114440918; round in float64
+        "predicted_prices_sek": surface.astype("float64").round(2).tolist(),
+    }
+
+
+@router.post("/explain", summary="Break a quote's predicted price down into per-field contributions")
+def explain_quote(data: QuoteML, user: CurrentUser = Depends(admitted_user)):
+    try:
+        with span("explain.model_lookup"):
+            loaded = model_registry.get(user.user_dir)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No model found for this user")
 
-@router.post("/save_quote", summary="Save quote data for training", status_code=201)
-def save_quote(data: QuoteWithTarget, token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    with span("explain.contributions"):
+        return explainer.explain(loaded, [data.model_dump()])[0]
 
-    user_email = payload["sub"]
-    user_dir = user_email.replace("@", "_").replace(".com", "")
-    data_dir = Path("data") / f"{user_dir}"
-    csv_file = data_dir / "quotes_features.csv"
 
-    os.makedirs(data_dir, exist_ok=True)
+@router.post("/explain/batch", summary="Per-field price contributions for a list of quotes in one model call")
+def explain_batch(data: List[QuoteML], user: CurrentUser = Depends(admitted_user)):
+    if len(data) > PREDICT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {PREDICT_BATCH_MAX_ITEMS} items")
 
-    row = data.dict()
+    try:
+        with span("explain_batch.model_lookup"):
+            loaded = model_registry.get(user.user_dir)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No model found for this user")
+
+    with span("explain_batch.contributions"):
+        explanations = explainer.explain(loaded, [item.model_dump() for item in data]) if data else []
+    return {"explanations": explanations}
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'line'}: {err['msg']}" for err in e.errors())
+
+
+def _predict_ndjson(body, loaded, chunk_rows: int = STREAM_CHUNK_ROWS):
+    """Yield one NDJSON result per non-empty input line, in input order, predicting a chunk at a time."""
+    features = loaded.encoder.empty(chunk_rows)
+    try:
+        pending = []  # (line number, row index into features or None, error message)
+        n_valid = 0
+        for line_no, raw in enumerate(body, start=1):
+            if not raw.strip():
+                continue
+            try:
+                item = QuoteML.model_validate_json(raw)
+            except ValidationError as e:
+                pending.append((line_no, None, _validation_message(e)))
+            else:
+                features[n_valid] = 0
+                loaded.encoder.encode_row(canonicalize(item.model_dump()), out=features[n_valid])
+                pending.append((line_no, n_valid, None))
+                n_valid += 1
+
+            if n_valid == chunk_rows or len(pending) >= 2 * chunk_rows:
+                yield _flush_ndjson(pending, loaded, features, n_valid)
+                pending, n_valid = [], 0
+        if pending:
+            yield _flush_ndjson(pending, loaded, features, n_valid)
+    finally:
+        body.close()
+
+
+def _flush_ndjson(pending, loaded, features, n_valid) -> str:
+    predictions = loaded.model.predict(features[:n_valid]) if n_valid else []
+    out = []
+    for line_no, row, error in pending:
+        if error is None:
+            record = {"line": line_no, "predicted_price_sek": round(float(predictions[row]), 2)}
+        else:
+            record = {"line": line_no, "error": error}
+        out.append(json.dumps(record, ensure_ascii=False))
+    return "\n".join(out) + "\n"
+
+
+@router.post("/stream", summary="Predict NDJSON quotes (one QuoteML per line), streaming NDJSON results")
+async def predict_stream(request: Request, user: CurrentUser = Depends(admitted_user)):
+    try:
+        loaded = await run_in_threadpool(model_registry.get, user.user_dir)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No model found for this user")
+
+    # The upload is spooled (RAM up to a limit, then a temp file) before responding: while
+    # the response streams, Starlette may consume the request channel to watch for
+    # disconnects, so the body cannot be read lazily from inside the response generator.
+    body = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_MEMORY_BYTES)
+    try:
+        async for chunk in request.stream():
+            body.write(chunk)
+    except BaseException:
+        body.close()
+        raise
+    body.seek(0)
 
-    write_header = not csv_file.exists()
-    with open(csv_file, mode="a", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=row.keys())
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
+    # A sync generator is iterated in the threadpool, keeping file reads and predictions off the event loop.
+    return StreamingResponse(_predict_ndjson(body, loaded), media_type="application/x-ndjson")
+
+
+@router.post("/save_quote", summary="Save quote data for training", status_code=201)
+def save_quote(data: QuoteWithTarget, user: CurrentUser = Depends(current_user)):
+    with span("save_quote.enqueue"):
+        sequence = quote_writer.enqueue(user.user_dir, data.model_dump())
 
-    return {"message": f"Quote saved for user '{user_email}'"}
+    return {"message": f"Quote saved for user '{user.email}'", "sequence": sequence}
@@ -1,14 +1,30 @@
 # routes/user.py
+from dataclasses import asdict
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from auth.auth_utils import decode_access_token
+from auth.dependencies import CurrentUser, current_user
+from services.model_registry import model_registry
+from services.retrainer import retrainer
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 @router.get("/me")
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return {"email": payload["sub"]}
+def get_current_user(user: CurrentUser = Depends(current_user)):
+    return {"email": user.email}
+
+
+@router.get("/model", summary="This user's model version loaded in the serving worker")
+def loaded_model(user: CurrentUser = Depends(current_user)):
+    loaded = model_registry.loaded_versions(user.user_dir)
+    if not loaded:
+        raise HTTPException(status_code=404, detail="No model loaded for this user in this worker")
+    return loaded[0]
+
+
+@router.get("/retrain", summary="Status of this user's most recent retraining job")
+def retrain_status(user: CurrentUser = Depends(current_user)):
+    return asdict(retrainer.status(user.user_dir))
+
+
+@router.post("/retrain", summary="Queue a retrain of this user's model from their saved quotes", status_code=202)
+def request_retrain(user: CurrentUser = Depends(current_user)):
+    return asdict(retrainer.request(user.user_dir))
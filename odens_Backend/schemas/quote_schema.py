@@ -1,13 +1,22 @@
 from pydantic import BaseModel, Field
+from typing import Annotated, List
+
+# Saved quantities are stored as int64; anything near that range is a typo, not an order
+MAX_QUANTITY = 10**9
 
 class QuoteML(BaseModel):
     weight_kg_m: float = Field(..., description="Material weight per meter")
     length_m: float = Field(..., description="Profile length in meters")
-    quantity: int = Field(..., description="Number of items quoted")
+    quantity: int = Field(..., gt=0, le=MAX_QUANTITY, description="Number of items quoted")
     raw_material_price_eur_kg: float = Field(..., description="Raw material price in EUR/kg")
     surface_treatment: str = Field(..., description="Surface treatment applied to profile")
     alloy: str = Field(..., description="Alloy type used in profile")
     profile_ref: str = Field(..., description="Reference to profile shape")
 
 class QuoteWithTarget(QuoteML):
-    quoted_price_sek: float = Field(..., description="Actual quoted price in SEK")
\ No newline at end of file
+    quoted_price_sek: float = Field(..., description="Actual quoted price in SEK")
+
+class PriceCurveRequest(BaseModel):
+    base: QuoteML = Field(..., description="Quote whose other fields stay fixed across the grid")
+    quantities: List[Annotated[int, Field(gt=0, le=MAX_QUANTITY)]] = Field(..., min_length=1, description="Quantity tiers to price")
+    raw_material_prices_eur_kg: List[float] = Field(..., min_length=1, description="Raw material (LME) scenarios in EUR/kg")
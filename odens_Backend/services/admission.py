@@ -0,0 +1,117 @@
+# services/admission.py
+import math
+import time
+from collections import OrderedDict
+
+from core.settings import (
+    ADMISSION_BURST,
+    ADMISSION_ENABLED,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_USERS,
+    ADMISSION_RATE_PER_S,
+)
+
+
+class _UserState:
+    __slots__ = ("tokens", "updated_at", "in_flight")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated_at = now
+        self.in_flight = 0
+
+
+class AdmissionController:
+    """Per-user token bucket plus a cap on concurrent requests, O(1) per request.
+
+    ``try_acquire`` either admits the request (and counts it in flight until ``release``)
+    or returns how many seconds the caller should wait before retrying. Only used from
+    the event loop, so it needs no lock; state is per worker process.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float = ADMISSION_RATE_PER_S,
+        burst: float = ADMISSION_BURST,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        max_users: int = ADMISSION_MAX_USERS,
+        enabled: bool = ADMISSION_ENABLED,
+        clock=time.monotonic,
+    ):
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_users = max_users
+        self.enabled = enabled
+        self._clock = clock
+        self._users = OrderedDict()
+        self.admitted = 0
+        self.rejected_rate = 0
+        self.rejected_in_flight = 0
+        self.in_flight = 0
+
+    def try_acquire(self, user_dir: str):
+        """Admit one request for ``user_dir``; returns None if admitted, else the Retry-After in seconds."""
+        if not self.enabled:
+            return None
+        now = self._clock()
+        state = self._users.get(user_dir)
+        if state is None:
+            state = self._users[user_dir] = _UserState(self.burst, now)
+            self._evict_idle()
+        else:
+            self._users.move_to_end(user_dir)
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * self.rate_per_s)
+            state.updated_at = now
+
+        if state.in_flight >= self.max_in_flight:
+            self.rejected_in_flight += 1
+            # No way to know when a slot frees up; one refill interval is a reasonable back-off
+            return 1.0 / self.rate_per_s if self.rate_per_s > 0 else 1.0
+        if state.tokens < 1.0:
+            self.rejected_rate += 1
+            return (1.0 - state.tokens) / self.rate_per_s if self.rate_per_s > 0 else 1.0
+
+        state.tokens -= 1.0
+        state.in_flight += 1
+        self.in_flight += 1
+        self.admitted += 1
+        return None
+
+    def release(self, user_dir: str):
+        if not self.enabled:
+            return
+        state = self._users.get(user_dir)
+        if state is not None and state.in_flight > 0:
+            state.in_flight -= 1
+            self.in_flight -= 1
+
+    def _evict_idle(self):
+        # Only the oldest entry is looked at, keeping this O(1); a user with requests in flight is
+        # rotated to the back rather than dropped, so its release() still finds the state.
+        while len(self._users) > self.max_users:
+            user_dir, state = next(iter(self._users.items()))
+            if state.in_flight:
+                self._users.move_to_end(user_dir)
+                break
+            del self._users[user_dir]
+
+    @staticmethod
+    def retry_after_header(seconds: float) -> str:
+        return str(max(1, math.ceil(seconds)))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "rate_per_s": self.rate_per_s,
+            "burst": self.burst,
+            "max_in_flight_per_user": self.max_in_flight,
+            "tracked_users": len(self._users),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected_rate": self.rejected_rate,
+            "rejected_in_flight": self.rejected_in_flight,
+        }
+
+
+admission = AdmissionController()
@@ -0,0 +1,78 @@
+# services/explainer.py
+"""Per-field price explanations from XGBoost's native TreeSHAP contributions.
+
+``Booster.predict(..., pred_contribs=True)`` returns one contribution per encoded
+column plus a bias column, and the row sum equals the predicted price. Contributions
+of a categorical field's one-hot columns (``profile_ref_Hörnvinkel``, ...) are summed
+back into that field with a single matrix product, so every quote is explained in
+terms of the seven ``QuoteML`` fields. Results are cached per (user, model version,
+canonical quote) like ``/predict/model_latest`` results.
+"""
+from core.settings import EXPLANATION_CACHE_MAX_ENTRIES, EXPLANATION_CACHE_TTL_S
+from services.model_registry import model_registry
+from services.result_cache import ResultCache, canonicalize
+
+
+def field_matrix(encoder):
+    """Return (fields, matrix) where ``contribs @ matrix`` sums encoded columns per original field."""
+    import numpy as np
+    from services.feature_encoder import CATEGORICAL_FIELDS
+
+    fields = list(encoder.numeric_index) + list(CATEGORICAL_FIELDS)
+    matrix = np.zeros((encoder.width, len(fields)), dtype=np.float32)
+    for j, field in enumerate(fields):
+        if field in encoder.numeric_index:
+            matrix[encoder.numeric_index[field], j] = 1
+        else:
+            for idx in encoder.category_index[field].values():
+                matrix[idx, j] = 1
+    return fields, matrix
+
+
+def explain_features(loaded, features) -> list:
+    """Explain an encoded ``(n, width)`` matrix in one ``pred_contribs`` call."""
+    import xgboost as xgb
+
+    dmatrix = xgb.DMatrix(features, feature_names=loaded.encoder.features_used)
+    contribs = loaded.model.get_booster().predict(dmatrix, pred_contribs=True)
+    fields, matrix = field_matrix(loaded.encoder)
+    per_field = contribs[:, :-1] @ matrix
+    bias = contribs[:, -1]
+    totals = contribs.sum(axis=1)
+    return [
+        {
+            "predicted_price_sek": round(float(totals[i]), 2),
+            "base_value_sek": round(float(bias[i]), 2),
+            "contributions_sek": {field: round(float(v), 2) for field, v in zip(fields, per_field[i])},
+        }
+        for i in range(len(contribs))
+    ]
+
+
+class Explainer:
+    """Cached explanations; cache misses of one call are explained together in a single batch."""
+
+    def __init__(self, cache: ResultCache):
+        self.cache = cache
+        self.explained = 0
+        self.batches = 0
+
+    def explain(self, loaded, records: list) -> list:
+        records = [canonicalize(record) for record in records]
+        results = [self.cache.get(loaded.user_dir, loaded.version, record) for record in records]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            features = loaded.encoder.encode([records[i] for i in missing])
+            for i, result in zip(missing, explain_features(loaded, features)):
+                results[i] = result
+                self.cache.put(loaded.user_dir, loaded.version, records[i], result)
+            self.explained += len(missing)
+            self.batches += 1
+        return results
+
+    def stats(self) -> dict:
+        return {"explained": self.explained, "batches": self.batches, **self.cache.stats()}
+
+
+explainer = Explainer(ResultCache(EXPLANATION_CACHE_MAX_ENTRIES, EXPLANATION_CACHE_TTL_S))
+model_registry.add_listener(explainer.cache.invalidate_user)
@@ -0,0 +1,128 @@
+# services/micro_batcher.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from core.settings import PREDICT_BATCH_MAX_SIZE, PREDICT_BATCH_WINDOW_MS, PREDICT_EXECUTOR_WORKERS
+
+# Upper bounds of the batch-size histogram buckets; the last bucket is open-ended.
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+@dataclass
+class _PendingBatch:
+    loaded: object
+    rows: list = field(default_factory=list)
+    futures: list = field(default_factory=list)
+    timer: asyncio.TimerHandle = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions for the same model into one ``predict`` call.
+
+    A batch is opened by the first request for a model and flushed after ``window_ms``
+    or as soon as it holds ``max_batch_size`` rows. Inference runs on a bounded thread
+    pool so the event loop keeps accepting requests. All batch bookkeeping happens on
+    the event loop thread, so it needs no locking.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = PREDICT_BATCH_WINDOW_MS,
+        max_batch_size: int = PREDICT_BATCH_MAX_SIZE,
+        max_workers: int = PREDICT_EXECUTOR_WORKERS,
+    ):
+        self.window_s = max(window_ms, 0) / 1000
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = {}
+        self._running = set()
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_seen = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="predict")
+        return self._executor
+
+    async def predict(self, loaded, row) -> float:
+        """Queue one encoded feature row for ``loaded`` and wait for its prediction."""
+        loop = asyncio.get_running_loop()
+        key = id(loaded)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(loaded)
+            batch.timer = loop.call_later(self.window_s, self._flush, key)
+
+        future = loop.create_future()
+        batch.rows.append(row)
+        batch.futures.append(future)
+        self.queue_depth += 1
+
+        if len(batch.rows) >= self.max_batch_size:
+            batch.timer.cancel()
+            self._flush(key)
+        return await future
+
+    def _flush(self, key):
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        size = len(batch.rows)
+        self.queue_depth -= size
+        self.batches += 1
+        self.rows += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        bucket = next((i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if size <= bound), len(BATCH_SIZE_BUCKETS))
+        self.batch_size_counts[bucket] += 1
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _PendingBatch):
+        import numpy as np
+
+        loop = asyncio.get_running_loop()
+        features = np.stack(batch.rows)
+        self.in_flight += len(batch.rows)
+        try:
+            predictions = await loop.run_in_executor(self.executor, batch.loaded.model.predict, features)
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, prediction in zip(batch.futures, predictions):
+                if not future.done():
+                    future.set_result(float(prediction))
+        finally:
+            self.in_flight -= len(batch.rows)
+
+    def stats(self) -> dict:
+        labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        return {
+            "window_ms": self.window_s * 1000,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "batch_size_histogram": dict(zip(labels, self.batch_size_counts)),
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+micro_batcher = MicroBatcher()
@@ -0,0 +1,228 @@
+# services/model_registry.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from core.settings import MODEL_DIR, MODEL_REGISTRY_MAX_ENTRIES
+from services.model_store import CURRENT_FILE, METADATA_FILE, MODEL_FILE, resolve_model_files
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+    from services.feature_encoder import FeatureEncoder
+
+
+def preload_dependencies():
+    """Import the scientific stack (numpy, xgboost) that model loading needs.
+
+    Kept out of module import so /health and /auth do not pay for it on cold start;
+    called from the lifespan warm-up or lazily by the first model load.
+    """
+    import xgboost  # noqa: F401
+    import services.feature_encoder  # noqa: F401
+
+
+@dataclass
+class LoadedModel:
+    user_dir: str
+    model: "xgb.XGBRegressor"
+    meta: dict
+    encoder: "FeatureEncoder"
+    # "<metadata version>@<trained_on>#<model content hash>", changes whenever a new model is deployed
+    version: str
+    # Published version directory (services/model_store.py), None for the legacy flat layout
+    deployment: str
+    # File stats the entry was loaded from; a different signature on disk triggers a reload
+    signature: tuple
+    # Process that parsed the model; differs from os.getpid() for models inherited from a pre-fork parent
+    loaded_by_pid: int = field(default_factory=os.getpid)
+
+
+class ModelRegistry:
+    """Bounded LRU of loaded per-user models, reloaded when the deployment on disk changes.
+
+    For versioned deployments only the ``CURRENT`` pointer is stat'ed per lookup; for the
+    legacy flat layout the model and metadata files are. Reloads happen outside the
+    registry lock, and while one thread reloads a user's model the others keep serving
+    the previous one, so a hot swap never blocks in-flight predictions.
+    """
+
+    def __init__(self, model_dir: str = MODEL_DIR, max_entries: int = MODEL_REGISTRY_MAX_ENTRIES):
+        self.model_dir = Path(model_dir)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.stale_served = 0
+        self.evictions = 0
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Call ``callback(user_dir)`` whenever a user's cached model is replaced or dropped."""
+        self._listeners.append(callback)
+
+    def _notify(self, user_dirs):
+        for user_dir in user_dirs:
+            for callback in self._listeners:
+                callback(user_dir)
+
+    def _signature(self, user_dir: str):
+        base = self.model_dir / user_dir
+        try:
+            current = os.stat(base / CURRENT_FILE)
+            # os.replace() of CURRENT always yields a new inode
+            return ("versioned", current.st_ino, current.st_mtime_ns, current.st_size)
+        except FileNotFoundError:
+            pass
+        try:
+            model_stat = os.stat(base / MODEL_FILE)
+            meta_stat = os.stat(base / METADATA_FILE)
+        except FileNotFoundError:
+            return None
+        return (
+            "flat",
+            model_stat.st_mtime_ns, model_stat.st_size,
+            meta_stat.st_mtime_ns, meta_stat.st_size,
+        )
+
+    def _load(self, user_dir: str, signature: tuple) -> LoadedModel:
+        import xgboost as xgb
+        from services.feature_encoder import FeatureEncoder
+
+        model_path, meta_path, deployment = resolve_model_files(user_dir, str(self.model_dir))
+        with open(model_path, "rb") as f:
+            raw = f.read()
+        model = xgb.XGBRegressor()
+        model.load_model(bytearray(raw))
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        version = f"{meta.get('version')}@{meta.get('trained_on')}#{hashlib.sha256(raw).hexdigest()[:12]}"
+        return LoadedModel(
+            user_dir=user_dir,
+            model=model,
+            meta=meta,
+            encoder=FeatureEncoder.from_metadata(meta),
+            version=version,
+            deployment=deployment,
+            signature=signature,
+        )
+
+    def get(self, user_dir: str) -> LoadedModel:
+        """Return the loaded model for a user, raising FileNotFoundError if none is deployed."""
+        signature = self._signature(user_dir)
+        if signature is None:
+            with self._lock:
+                dropped = self._entries.pop(user_dir, None)
+            if dropped is not None:
+                self._notify([user_dir])
+            raise FileNotFoundError(f"No model found for '{user_dir}'")
+
+        with self._lock:
+            entry = self._entries.get(user_dir)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(user_dir)
+                self.hits += 1
+                return entry
+            load_lock = self._load_locks.setdefault(user_dir, threading.Lock())
+
+        if entry is not None:
+            # Stale entry: one thread reloads, everyone else keeps using the old model meanwhile.
+            if not load_lock.acquire(blocking=False):
+                with self._lock:
+                    self.stale_served += 1
+                return entry
+        else:
+            load_lock.acquire()
+
+        try:
+            with self._lock:
+                current = self._entries.get(user_dir)
+                if current is not None and current.signature == signature:
+                    self.hits += 1
+                    return current
+                if current is None:
+                    self.misses += 1
+                else:
+                    self.reloads += 1
+
+            # Parse outside the registry lock so one slow load does not stall other tenants.
+            loaded = self._load(user_dir, signature)
+
+            changed = [user_dir] if current is not None else []
+            with self._lock:
+                self._entries[user_dir] = loaded
+                self._entries.move_to_end(user_dir)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    changed.append(evicted)
+                    self.evictions += 1
+        finally:
+            load_lock.release()
+
+        self._notify(changed)
+        return loaded
+
+    def warm_up(self, user_dirs, predict: bool = True) -> dict:
+        """Load each user's model and run one dummy prediction; returns {user_dir: version or error}.
+
+        ``predict=False`` only loads, for a pre-fork parent process: running a prediction
+        there would start XGBoost's OpenMP thread pool, which does not survive fork().
+        """
+        results = {}
+        for user_dir in list(user_dirs)[: self.max_entries]:
+            try:
+                loaded = self.get(user_dir)
+                if predict:
+                    loaded.model.predict(loaded.encoder.empty(1))
+                results[user_dir] = loaded.version
+            except Exception as e:
+                results[user_dir] = f"error: {e}"
+        return results
+
+    def invalidate(self, user_dir: str = None):
+        with self._lock:
+            if user_dir is None:
+                dropped = list(self._entries)
+                self._entries.clear()
+            else:
+                dropped = [user_dir] if self._entries.pop(user_dir, None) is not None else []
+        self._notify(dropped)
+
+    def loaded_versions(self, user_dir: str = None) -> list:
+        """Loaded entries in this worker, only ``user_dir``'s when given."""
+        with self._lock:
+            entries = [e for e in self._entries.values() if user_dir is None or e.user_dir == user_dir]
+        return [
+            {
+                "user_dir": e.user_dir,
+                "deployment": e.deployment,
+                "version": e.version,
+                "trained_on": e.meta.get("trained_on"),
+                "inherited": e.loaded_by_pid != os.getpid(),
+            }
+            for e in entries
+        ]
+
+    def stats(self) -> dict:
+        pid = os.getpid()
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "inherited_entries": sum(e.loaded_by_pid != pid for e in self._entries.values()),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "stale_served": self.stale_served,
+                "evictions": self.evictions,
+            }
+
+
+model_registry = ModelRegistry()
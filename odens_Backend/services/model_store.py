@@ -0,0 +1,167 @@
+# services/model_store.py
+"""Versioned on-disk model deployments.
+
+Layout per user::
+
+    ml_models/{user_dir}/versions/{version_id}/xgboost_model.json
+    ml_models/{user_dir}/versions/{version_id}/model_metadata.json
+    ml_models/{user_dir}/CURRENT            <- text file holding the active version_id
+
+Version directories are immutable once published. Publishing copies the files into a
+hidden temporary directory, renames it into ``versions/`` and then atomically replaces
+``CURRENT``, so a reader never sees a half-copied model. Users without ``CURRENT`` keep
+the legacy flat layout (``ml_models/{user_dir}/xgboost_model.json``).
+
+    python -m services.model_store publish --user bilal_yahoo \\
+        --model ../odens_PriceAssistant/models/user_alpha/xgboost_model.json \\
+        --metadata ../odens_PriceAssistant/models/user_alpha/model_metadata.json
+    python -m services.model_store list --user bilal_yahoo
+    python -m services.model_store activate --user bilal_yahoo --version <version_id>
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+
+from core.settings import MODEL_DIR
+
+MODEL_FILE = "xgboost_model.json"
+METADATA_FILE = "model_metadata.json"
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def user_model_root(user_dir: str, model_dir: str = MODEL_DIR) -> Path:
+    return Path(model_dir) / user_dir
+
+
+def _fsync_dir(path: Path):
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def current_version(user_dir: str, model_dir: str = MODEL_DIR):
+    """Active version id, or None when the user has no versioned deployment."""
+    try:
+        return (user_model_root(user_dir, model_dir) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_model_files(user_dir: str, model_dir: str = MODEL_DIR):
+    """Return (model_path, metadata_path, version_id) for the active deployment.
+
+    ``version_id`` is None for the legacy flat layout.
+    """
+    root = user_model_root(user_dir, model_dir)
+    version_id = current_version(user_dir, model_dir)
+    base = root if version_id is None else root / VERSIONS_DIR / version_id
+    return base / MODEL_FILE, base / METADATA_FILE, version_id
+
+
+def list_versions(user_dir: str, model_dir: str = MODEL_DIR) -> list:
+    versions = user_model_root(user_dir, model_dir) / VERSIONS_DIR
+    if not versions.is_dir():
+        return []
+    return sorted(p.name for p in versions.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+
+def active_users(model_dir: str = MODEL_DIR) -> list:
+    """User directories that have a deployed model, in either layout."""
+    root = Path(model_dir)
+    if not root.is_dir():
+        return []
+    return sorted(
+        p.name for p in root.iterdir()
+        if p.is_dir() and ((p / CURRENT_FILE).exists() or (p / MODEL_FILE).exists())
+    )
+
+
+def activate_version(user_dir: str, version_id: str, model_dir: str = MODEL_DIR):
+    """Atomically point CURRENT at an already published version."""
+    root = user_model_root(user_dir, model_dir)
+    if not (root / VERSIONS_DIR / version_id / MODEL_FILE).exists():
+        raise FileNotFoundError(f"Version '{version_id}' is not published for '{user_dir}'")
+
+    tmp_path = root / f".{CURRENT_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(version_id + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, root / CURRENT_FILE)
+    _fsync_dir(root)
+
+
+def publish_model(
+    user_dir: str,
+    model_path: Path,
+    metadata_path: Path,
+    version_id: str = None,
+    activate: bool = True,
+    model_dir: str = MODEL_DIR,
+) -> str:
+    """Copy a trained model + metadata into a new immutable version directory and (by default) activate it."""
+    model_path, metadata_path = Path(model_path), Path(metadata_path)
+    if version_id is None:
+        digest = hashlib.sha256(model_path.read_bytes()).hexdigest()[:8]
+        version_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{digest}"
+
+    versions = user_model_root(user_dir, model_dir) / VERSIONS_DIR
+    final_dir = versions / version_id
+    if final_dir.exists():
+        raise FileExistsError(f"Version '{version_id}' already exists for '{user_dir}'")
+
+    tmp_dir = versions / f".{version_id}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for src, name in ((model_path, MODEL_FILE), (metadata_path, METADATA_FILE)):
+        shutil.copyfile(src, tmp_dir / name)
+        with open(tmp_dir / name, "rb") as f:
+            os.fsync(f.fileno())
+    os.rename(tmp_dir, final_dir)
+    _fsync_dir(versions)
+
+    if activate:
+        activate_version(user_dir, version_id, model_dir)
+    return version_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish and activate versioned user models.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    publish = sub.add_parser("publish", help="Publish a trained model as a new version")
+    publish.add_argument("--user", required=True, help="Sanitized user directory, e.g. bilal_yahoo")
+    publish.add_argument("--model", required=True, type=Path)
+    publish.add_argument("--metadata", required=True, type=Path)
+    publish.add_argument("--version", help="Version id (default: timestamp + model hash)")
+    publish.add_argument("--no-activate", action="store_true")
+
+    listing = sub.add_parser("list", help="List published versions")
+    listing.add_argument("--user", required=True)
+
+    activate = sub.add_parser("activate", help="Point CURRENT at a published version (rollback)")
+    activate.add_argument("--user", required=True)
+    activate.add_argument("--version", required=True)
+
+    args = parser.parse_args()
+    if args.command == "publish":
+        version_id = publish_model(args.user, args.model, args.metadata, args.version, activate=not args.no_activate)
+        print(f"Published {args.user}/{version_id}" + ("" if args.no_activate else " (active)"))
+    elif args.command == "list":
+        active = current_version(args.user)
+        for version_id in list_versions(args.user):
+            print(("* " if version_id == active else "  ") + version_id)
+    else:
+        activate_version(args.user, args.version)
+        print(f"Activated {args.user}/{args.version}")
+
+
+if __name__ == "__main__":
+    main()
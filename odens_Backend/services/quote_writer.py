@@ -0,0 +1,209 @@
+# services/quote_writer.py
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development servers only
+    fcntl = None
+
+from core.settings import (
+    DATA_DIR,
+    QUOTE_STORAGE,
+    QUOTE_WRITER_FLUSH_INTERVAL_MS,
+    QUOTE_WRITER_FLUSH_ROWS,
+    QUOTE_WRITER_FSYNC,
+)
+
+logger = logging.getLogger(__name__)
+
+QUOTES_FILE = "quotes_features.csv"
+QUARANTINE_DIR = "quarantine"
+
+
+class QuoteWriter:
+    """Group-commit writer for saved quotes.
+
+    Requests only append to an in-memory per-user buffer and get back a sequence
+    number. A background thread flushes the buffers every ``flush_interval_ms``,
+    or early once a user has ``flush_rows`` rows waiting, writing each user's batch
+    with a single open/write/fsync under that user's lock: one Parquet file in the
+    user's partitioned store, or an append to the legacy CSV. ``close()`` flushes
+    everything that is still buffered. A batch that fails with ``OSError`` is
+    re-queued; any other error means the rows themselves cannot be written, so the
+    batch is set aside as JSON lines under ``data/{user}/quarantine/`` instead, as are
+    re-queued rows still unwritten at shutdown. CSV appends also hold an exclusive
+    ``flock`` on the file, since every gunicorn worker runs its own writer.
+    """
+
+    def __init__(
+        self,
+        data_dir: str = DATA_DIR,
+        flush_rows: int = QUOTE_WRITER_FLUSH_ROWS,
+        flush_interval_ms: float = QUOTE_WRITER_FLUSH_INTERVAL_MS,
+        fsync: bool = QUOTE_WRITER_FSYNC,
+        storage: str = QUOTE_STORAGE,
+    ):
+        if storage not in ("parquet", "csv"):
+            raise ValueError(f"Unknown quote storage '{storage}'")
+        self.data_dir = Path(data_dir)
+        self.storage = storage
+        self.flush_rows = max(flush_rows, 1)
+        self.flush_interval_s = flush_interval_ms / 1000
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._buffers = defaultdict(list)
+        self._sequences = defaultdict(int)
+        self._user_locks = defaultdict(threading.Lock)
+        self._thread = None
+        self._stopping = False
+        self._listeners = []
+        self.rows_written = 0
+        self.flushes = 0
+        self.write_errors = 0
+        self.quarantined_rows = 0
+
+    def add_listener(self, callback):
+        """Call ``callback(user_dir, n_rows)`` after rows for a user have been written to disk."""
+        self._listeners.append(callback)
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="quote-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, user_dir: str, row: dict) -> int:
+        """Buffer one row for ``user_dir`` and return its per-user sequence number."""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        with self._cond:
+            self._sequences[user_dir] += 1
+            seq = self._sequences[user_dir]
+            buffer = self._buffers[user_dir]
+            buffer.append(row)
+            if len(buffer) >= self.flush_rows:
+                self._cond.notify()
+        return seq
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and not self._has_full_buffer():
+                    self._cond.wait(self.flush_interval_s)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def _has_full_buffer(self) -> bool:
+        return any(len(rows) >= self.flush_rows for rows in self._buffers.values())
+
+    def flush(self, user_dir: str = None):
+        """Write buffered rows to disk, for one user or for everyone."""
+        with self._cond:
+            users = [user_dir] if user_dir is not None else [u for u, rows in self._buffers.items() if rows]
+            locks = [self._user_locks[u] for u in users]
+
+        for user, lock in zip(users, locks):
+            # Rows are taken while holding the user lock so batches reach disk in order.
+            with lock:
+                with self._cond:
+                    rows = self._buffers.pop(user, [])
+                if not rows:
+                    continue
+                try:
+                    self._write(user, rows)
+                except OSError:
+                    logger.exception("Failed to write %d quotes for '%s'; re-queued", len(rows), user)
+                    self.write_errors += 1
+                    with self._cond:
+                        self._buffers[user][:0] = rows
+                    continue
+                except Exception:
+                    logger.exception("Failed to write %d quotes for '%s'; quarantined", len(rows), user)
+                    self.write_errors += 1
+                    self._quarantine(user, rows)
+                    continue
+            self.rows_written += len(rows)
+            self.flushes += 1
+            for callback in self._listeners:
+                try:
+                    callback(user, len(rows))
+                except Exception:
+                    logger.exception("Quote writer listener failed for '%s'", user)
+
+    def _quarantine(self, user_dir: str, rows: list):
+        """Keep a batch that cannot be written out of the buffers, as JSON lines for inspection."""
+        quarantine_path = self.data_dir / user_dir / QUARANTINE_DIR
+        try:
+            os.makedirs(quarantine_path, exist_ok=True)
+            with open(quarantine_path / f"quotes-{time.time_ns()}.jsonl", "w") as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=str) + "\n")
+        except Exception:
+            logger.exception("Failed to quarantine %d quotes for '%s'; dropped", len(rows), user_dir)
+        self.quarantined_rows += len(rows)
+
+    def _write(self, user_dir: str, rows: list):
+        if self.storage == "parquet":
+            # pyarrow is imported on the first flush rather than at app startup
+            from database.quote_store import write_quotes
+
+            write_quotes(user_dir, rows, data_dir=str(self.data_dir), fsync=self.fsync)
+            return
+
+        user_path = self.data_dir / user_dir
+        os.makedirs(user_path, exist_ok=True)
+        csv_file = user_path / QUOTES_FILE
+
+        with open(csv_file, mode="a", newline="") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+                f.seek(0, os.SEEK_END)  # another worker may have appended while we waited
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            if f.tell() == 0:
+                writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def close(self):
+        """Stop the background thread and flush every buffered row."""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+        self._thread = None
+        self.flush()
+        with self._cond:
+            leftover = {user: rows for user, rows in self._buffers.items() if rows}
+            self._buffers.clear()
+        for user, rows in leftover.items():
+            logger.error("Quarantining %d quotes for '%s' that could not be written before shutdown", len(rows), user)
+            self._quarantine(user, rows)
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = sum(len(rows) for rows in self._buffers.values())
+        return {
+            "pending_rows": pending,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "write_errors": self.write_errors,
+            "quarantined_rows": self.quarantined_rows,
+        }
+
+
+quote_writer = QuoteWriter()
@@ -0,0 +1,113 @@
+# services/result_cache.py
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from core.settings import (
+    PREDICTION_CACHE_FLOAT_DECIMALS,
+    PREDICTION_CACHE_MAX_ENTRIES,
+    PREDICTION_CACHE_TTL_S,
+)
+from services.model_registry import model_registry
+
+
+def canonicalize(record: dict, float_decimals: int = PREDICTION_CACHE_FLOAT_DECIMALS) -> dict:
+    """Normalize a quote so equivalent inputs share a cache key: floats rounded, strings stripped."""
+    canonical = {}
+    for field, value in record.items():
+        if isinstance(value, float):
+            value = round(value, float_decimals)
+        elif isinstance(value, str):
+            value = value.strip()
+        canonical[field] = value
+    return canonical
+
+
+class ResultCache:
+    """Bounded LRU + TTL cache of model outputs keyed by (user, model version, canonical input).
+
+    Because the model version is part of the key, a newly deployed model never sees
+    results from the previous one; ``invalidate_user`` frees the stale entries early.
+    """
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_MAX_ENTRIES, ttl_s: float = PREDICTION_CACHE_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()
+        self._keys_by_user = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_dir: str, version: str, record: dict) -> tuple:
+        return (user_dir, version, tuple(sorted(record.items())))
+
+    def get(self, user_dir: str, version: str, record: dict):
+        key = self._key(user_dir, version, record)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, user_dir: str, version: str, record: dict, value):
+        if self.max_entries <= 0:
+            return
+        key = self._key(user_dir, version, record)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_s)
+            self._entries.move_to_end(key)
+            self._keys_by_user[user_dir].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: tuple):
+        del self._entries[key]
+        user_keys = self._keys_by_user.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[key[0]]
+
+    def invalidate_user(self, user_dir: str):
+        with self._lock:
+            for key in self._keys_by_user.pop(user_dir, ()):
+                self._entries.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+prediction_cache = ResultCache()
+model_registry.add_listener(prediction_cache.invalidate_user)
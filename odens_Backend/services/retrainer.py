@@ -0,0 +1,412 @@
+# services/retrainer.py
+"""Background retraining of user models from their saved quotes.
+
+The quote writer reports every flushed batch; once a user has ``min_new_rows`` new
+quotes (or ``interval_s`` has passed since their last retrain with at least one new
+quote) a job is queued. Jobs run ``train_user_model`` in a separate process pool, so
+training never competes with request handling for the GIL, and publish the result
+through ``services.model_store.publish_model`` as an inactive version. The version is
+activated, an atomic CURRENT switch the model registry picks up on the next request,
+only if its CV metrics are no worse than the current model's; otherwise the job ends
+as ``rejected`` and the current model keeps serving.
+
+Training follows ``odens_PriceAssistant/scripts/ml_model_training.py`` without the
+Optuna search: the hyperparameters of the user's current model are reused, and the
+model is evaluated with the same 5-fold CV before being fitted on all rows. The rows
+are the user's base training set (``data/{user}/training_features.csv``) plus every
+saved quote, encoded onto the current model's features plus any new categories.
+
+Every gunicorn worker runs its own retrainer, so a job holds an exclusive lock on
+``ml_models/{user}/.retrain.lock``; a job that finds it taken ends as ``skipped``.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from core.settings import (
+    DATA_DIR,
+    MODEL_DIR,
+    RETRAIN_BASE_FEATURES_FILE,
+    RETRAIN_CHECK_INTERVAL_S,
+    RETRAIN_ENABLED,
+    RETRAIN_INTERVAL_S,
+    RETRAIN_MIN_NEW_ROWS,
+    RETRAIN_METRIC_TOLERANCE,
+    RETRAIN_MIN_TRAINING_ROWS,
+    RETRAIN_WORKERS,
+)
+from services.model_store import resolve_model_files, user_model_root
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development servers only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_COLUMNS = ["weight_kg_m", "length_m", "quantity", "raw_material_price_eur_kg"]
+CATEGORICAL_COLUMNS = ["profile_ref", "surface_treatment", "alloy"]
+TARGET_COLUMN = "quoted_price_sek"
+# Used when the current model's metadata carries no tuned hyperparameters
+DEFAULT_HYPERPARAMETERS = {
+    "learning_rate": 0.1,
+    "max_depth": 4,
+    "n_estimators": 300,
+    "subsample": 0.9,
+    "colsample_bytree": 0.9,
+}
+# CV metrics compared against the current model's before activation; True when lower is better
+GATED_METRICS = {"RMSE": True, "MAPE": True, "R2": False}
+LOCK_FILE = ".retrain.lock"
+
+
+class RetrainLocked(RuntimeError):
+    """Another process is already retraining this user."""
+
+
+def _load_saved_quotes(user_dir: str, data_dir: str):
+    # Covers both storage modes: the Parquet partitions and the (legacy) quotes_features.csv
+    from database.quote_store import read_quotes
+
+    return read_quotes(user_dir, columns=NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + [TARGET_COLUMN], data_dir=data_dir)
+
+
+def _evaluate(X, y, params: dict) -> dict:
+    import xgboost as xgb
+    from sklearn.metrics import mean_absolute_percentage_error, r2_score, root_mean_squared_error
+    from sklearn.model_selection import KFold
+
+    preds, actuals = [], []
+    for train_index, test_index in KFold(n_splits=5, shuffle=True, random_state=42).split(X):
+        model = xgb.XGBRegressor(**params)
+        model.fit(X.iloc[train_index], y.iloc[train_index])
+        preds.extend(model.predict(X.iloc[test_index]))
+        actuals.extend(y.iloc[test_index])
+    return {
+        "RMSE": round(float(root_mean_squared_error(actuals, preds)), 4),
+        "R2": round(float(r2_score(actuals, preds)), 4),
+        "MAPE": round(float(mean_absolute_percentage_error(actuals, preds)), 4),
+    }
+
+
+def _load_base_features(user_dir: str, data_dir: str):
+    import pandas as pd
+
+    path = Path(data_dir) / user_dir / RETRAIN_BASE_FEATURES_FILE
+    if not path.exists():
+        logger.warning("No base training set %s for '%s'; retraining on saved quotes only", path, user_dir)
+        return None
+    return pd.read_csv(path).dropna()
+
+
+def _metric_regressions(metrics: dict, previous: dict, tolerance: float) -> list:
+    """Descriptions of the metrics in which ``metrics`` is worse than ``previous`` by more than ``tolerance``."""
+    worse = []
+    for name, lower_is_better in GATED_METRICS.items():
+        if name not in metrics or name not in previous:
+            continue
+        new, old = metrics[name], previous[name]
+        slack = tolerance * abs(old)
+        if (new > old + slack) if lower_is_better else (new < old - slack):
+            worse.append(f"{name} {new} vs {old}")
+    return worse
+
+
+class _UserLock:
+    """Non-blocking exclusive flock on the user's ``.retrain.lock``; raises ``RetrainLocked`` if taken."""
+
+    def __init__(self, user_dir: str, model_dir: str):
+        self.path = user_model_root(user_dir, model_dir) / LOCK_FILE
+        self.user_dir = user_dir
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._file = open(self.path, "a")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._file.close()
+            raise RetrainLocked(f"'{self.user_dir}' is already being retrained by another process")
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            self._file.close()  # releases the lock
+
+
+def train_user_model(
+    user_dir: str,
+    data_dir: str = DATA_DIR,
+    model_dir: str = MODEL_DIR,
+    min_rows: int = RETRAIN_MIN_TRAINING_ROWS,
+    tolerance: float = RETRAIN_METRIC_TOLERANCE,
+) -> dict:
+    """Retrain ``user_dir``'s model on its base training set plus saved quotes; runs in a worker process.
+
+    The new version is always published, but activated only if its CV metrics pass
+    ``_metric_regressions`` against the current model's.
+    """
+    with _UserLock(user_dir, model_dir):
+        return _train_and_publish(user_dir, data_dir, model_dir, min_rows, tolerance)
+
+
+def _train_and_publish(user_dir: str, data_dir: str, model_dir: str, min_rows: int, tolerance: float) -> dict:
+    import pandas as pd
+    import xgboost as xgb
+
+    from services.model_store import activate_version, publish_model
+
+    raw = _load_saved_quotes(user_dir, data_dir).dropna()
+    if len(raw) < min_rows:
+        raise ValueError(f"Only {len(raw)} saved quotes for '{user_dir}', need at least {min_rows}")
+
+    previous = {}
+    try:
+        _, meta_path, _ = resolve_model_files(user_dir, model_dir)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except FileNotFoundError:
+        pass
+    params = {"verbosity": 0, "objective": "reg:squarederror", **(previous.get("hyperparameters") or DEFAULT_HYPERPARAMETERS)}
+
+    saved = pd.get_dummies(raw, columns=CATEGORICAL_COLUMNS, dtype=float)
+    base = _load_base_features(user_dir, data_dir)
+    df = saved if base is None else pd.concat([base, saved], ignore_index=True)
+    # Keep every feature of the current model, so categories absent from the new rows are not lost
+    features = list(previous.get("features_used") or [])
+    features += [c for c in df.columns if c != TARGET_COLUMN and c not in features]
+    X = df.reindex(columns=features).fillna(0.0)
+    y = df[TARGET_COLUMN]
+
+    metrics = _evaluate(X, y, params)
+    regressions = _metric_regressions(metrics, previous.get("metrics") or {}, tolerance)
+    model = xgb.XGBRegressor(**params)
+    model.fit(X, y)
+
+    metadata = {
+        "model_type": "xgboost",
+        "trained_on": time.strftime("%Y-%m-%d %H:%M"),
+        "metrics": metrics,
+        "features_used": list(X.columns),
+        "hyperparameters": {k: v for k, v in params.items() if k not in ("verbosity", "objective")},
+        "user": previous.get("user", user_dir),
+        "version": f"retrain-{time.strftime('%Y%m%d%H%M%S')}",
+        "training_rows": len(df),
+        "saved_quote_rows": len(saved),
+    }
+    with tempfile.TemporaryDirectory(prefix="odens-retrain-") as tmp:
+        model_path = Path(tmp) / "xgboost_model.json"
+        meta_path = Path(tmp) / "model_metadata.json"
+        model.save_model(str(model_path))
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        version_id = publish_model(user_dir, model_path, meta_path, activate=False, model_dir=model_dir)
+    if not regressions:
+        activate_version(user_dir, version_id, model_dir)
+    return {
+        "version_id": version_id,
+        "training_rows": len(df),
+        "metrics": metrics,
+        "previous_metrics": previous.get("metrics"),
+        "activated": not regressions,
+        "rejection": "; ".join(regressions) or None,
+    }
+
+
+@dataclass
+class RetrainStatus:
+    # idle | queued | running | succeeded | rejected | skipped | failed (state of the most recent job)
+    state: str = "idle"
+    new_rows: int = 0
+    trigger: str = None
+    queued_at: float = None
+    started_at: float = None
+    finished_at: float = None
+    version_id: str = None
+    training_rows: int = None
+    metrics: dict = None
+    # Metrics of the model that was serving when the job started, and why the new one was not activated
+    previous_metrics: dict = None
+    rejection: str = None
+    error: str = None
+    last_trained_at: float = field(default_factory=time.time)
+
+
+class Retrainer:
+    """Counts new saved quotes per user and runs retrain jobs in a process pool.
+
+    Counts are per worker process and start from zero at startup. A job snapshots
+    the user's count when it is queued, so rows saved while it runs count towards
+    the next job; a failed job does not restore its rows, so a broken data set is
+    retried after the next threshold rather than in a loop. With several workers
+    each counts its own saves; the per-user lock in ``train_user_model`` keeps their
+    jobs from training and publishing the same user at once.
+    """
+
+    def __init__(
+        self,
+        min_new_rows: int = RETRAIN_MIN_NEW_ROWS,
+        interval_s: float = RETRAIN_INTERVAL_S,
+        check_interval_s: float = RETRAIN_CHECK_INTERVAL_S,
+        workers: int = RETRAIN_WORKERS,
+        enabled: bool = RETRAIN_ENABLED,
+        data_dir: str = DATA_DIR,
+        model_dir: str = MODEL_DIR,
+    ):
+        self.min_new_rows = min_new_rows
+        self.interval_s = interval_s
+        self.check_interval_s = check_interval_s
+        self.workers = max(workers, 1)
+        self.enabled = enabled
+        self.data_dir = data_dir
+        self.model_dir = model_dir
+        self._cond = threading.Condition()
+        self._status = {}
+        self._executor = None
+        self._thread = None
+        self._stopping = False
+        self.jobs_succeeded = 0
+        self.jobs_rejected = 0
+        self.jobs_skipped = 0
+        self.jobs_failed = 0
+
+    def start(self):
+        if not self.enabled:
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="retrainer", daemon=True)
+            self._thread.start()
+
+    def record_rows(self, user_dir: str, n_rows: int):
+        """quote_writer listener: ``n_rows`` new quotes of ``user_dir`` reached disk."""
+        with self._cond:
+            status = self._status.setdefault(user_dir, RetrainStatus())
+            status.new_rows += n_rows
+            if self.min_new_rows and status.new_rows >= self.min_new_rows:
+                self._cond.notify()
+
+    def request(self, user_dir: str) -> RetrainStatus:
+        """Queue a retrain for ``user_dir`` now, unless one is already queued or running."""
+        with self._cond:
+            status = self._status.setdefault(user_dir, RetrainStatus())
+            if status.state not in ("queued", "running"):
+                self._submit(user_dir, status, "manual")
+            return RetrainStatus(**asdict(status))
+
+    def status(self, user_dir: str) -> RetrainStatus:
+        with self._cond:
+            return RetrainStatus(**asdict(self._status.setdefault(user_dir, RetrainStatus())))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.check_interval_s)
+                if self._stopping:
+                    return
+                now = time.time()
+                for user_dir, status in self._status.items():
+                    if status.state in ("queued", "running") or status.new_rows == 0:
+                        continue
+                    if self.min_new_rows and status.new_rows >= self.min_new_rows:
+                        self._submit(user_dir, status, "threshold")
+                    elif self.interval_s and now - status.last_trained_at >= self.interval_s:
+                        self._submit(user_dir, status, "schedule")
+
+    def _submit(self, user_dir: str, status: RetrainStatus, trigger: str):
+        # Called with self._cond held.
+        if self._executor is None:
+            # spawn: forking this multi-threaded server process could deadlock the child
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        status.state = "queued"
+        status.trigger = trigger
+        status.queued_at = time.time()
+        status.started_at = status.finished_at = status.error = status.rejection = None
+        status.new_rows = 0
+        future = self._executor.submit(train_user_model, user_dir, self.data_dir, self.model_dir)
+        # The pool gives no start notification; a queued job counts as running once a worker is free
+        status.state = "running" if self._running_jobs() <= self.workers else "queued"
+        status.started_at = status.queued_at if status.state == "running" else None
+        future.add_done_callback(lambda f: self._finished(user_dir, f))
+
+    def _running_jobs(self) -> int:
+        return sum(s.state == "running" for s in self._status.values()) + 1
+
+    def _finished(self, user_dir: str, future):
+        with self._cond:
+            status = self._status[user_dir]
+            status.finished_at = time.time()
+            status.started_at = status.started_at or status.queued_at
+            if future.cancelled():
+                status.state, status.error = "failed", "cancelled"
+            elif isinstance(future.exception(), RetrainLocked):
+                status.state, status.error = "skipped", str(future.exception())
+                self.jobs_skipped += 1
+                logger.info("Retraining '%s' skipped: %s", user_dir, status.error)
+            elif future.exception() is not None:
+                status.state, status.error = "failed", str(future.exception())
+                self.jobs_failed += 1
+                logger.warning("Retraining '%s' failed: %s", user_dir, status.error)
+            else:
+                result = future.result()
+                status.version_id = result["version_id"]
+                status.training_rows = result["training_rows"]
+                status.metrics = result["metrics"]
+                status.previous_metrics = result["previous_metrics"]
+                status.rejection = result["rejection"]
+                status.last_trained_at = status.finished_at
+                if result["activated"]:
+                    status.state = "succeeded"
+                    self.jobs_succeeded += 1
+                    logger.info("Retrained '%s' on %d rows as %s", user_dir, status.training_rows, status.version_id)
+                else:
+                    status.state = "rejected"
+                    self.jobs_rejected += 1
+                    logger.warning("Retrained '%s' as %s but kept the current model: %s", user_dir, status.version_id, status.rejection)
+            # Promote the next queued job, now that a worker is free
+            for other in self._status.values():
+                if other.state == "queued":
+                    other.state, other.started_at = "running", time.time()
+                    break
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        if thread is not None:
+            thread.join()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._cond:
+            states = [s.state for s in self._status.values()]
+            pending = sum(s.new_rows for s in self._status.values())
+        return {
+            "enabled": self.enabled,
+            "tracked_users": len(states),
+            "pending_rows": pending,
+            "jobs_queued": states.count("queued"),
+            "jobs_running": states.count("running"),
+            "jobs_succeeded": self.jobs_succeeded,
+            "jobs_rejected": self.jobs_rejected,
+            "jobs_skipped": self.jobs_skipped,
+            "jobs_failed": self.jobs_failed,
+        }
+
+
+retrainer = Retrainer()
@@ -0,0 +1,107 @@
+# benchmarks/bench_pdf_extraction.py
+"""Time the old PDF path (extract_text() twice per page + full-text dump) against streaming extraction.
+
+Run from odens_PriceAssistant/ on the 50-PDF corpus (or any folder of quote PDFs):
+
+    python -m benchmarks.bench_pdf_extraction --folder "data/user_alpha/originial_Quotes_data"
+"""
+import argparse
+import contextlib
+import os
+import time
+from pathlib import Path
+
+import pdfplumber
+
+from scripts.extract_pdf_quotes import (
+    PDF_FOLDER,
+    iter_pdf_pages,
+    iter_quotes_from_pages,
+    iter_quotes_from_pdf,
+    parse_quote_from_text,
+)
+from scripts.quote_parser import get_parser
+
+
+def legacy_extract(path, sink):
+    """The extraction loop as it was before streaming, printing to ``sink``."""
+    with contextlib.redirect_stdout(sink):
+        print("Entered step 1")
+        with pdfplumber.open(path) as pdf:
+            text = "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
+        print("Extracted Text starts here\n")
+        print(text)
+        print("Extracted Text ends here\n")
+    return parse_quote_from_text(text, path)
+
+
+def headers_last(pages):
+    """The same text with the date line kept in place and every other header line moved to a last page."""
+    parser = get_parser()
+    date_marker = parser.layout.date_marker
+    moved = [line for text in pages for line in parser.header_lines(text) if date_marker not in line]
+    body = [parser.header_line_re.sub(lambda m: m.group() if date_marker in m.group() else "", text) for text in pages]
+    return body + ["\n".join(moved)]
+
+
+def split_rows(pages):
+    """The same text with the first product line of every later page broken by the page break before it."""
+    line_re = get_parser().line_re
+    split = [pages[0]]
+    for text in pages[1:]:
+        match = line_re.search(text)
+        if match is None:
+            split.append(text)
+            continue
+        # Everything up to the row's length moves to the end of the previous page
+        cut = match.start("length")
+        split[-1] += "\n" + text[:cut].rstrip()
+        split.append(text[cut:])
+    return split
+
+
+def check_parity(files):
+    """Streaming must match the joined-text path for headers after the product lines and rows split by a page break."""
+    for f in files:
+        pages = list(iter_pdf_pages(f))
+        for name, variant in (("headers-last", headers_last(pages)), ("split-rows", split_rows(pages))):
+            streamed = list(iter_quotes_from_pages(variant, f))
+            assert streamed == parse_quote_from_text("\n".join(variant), f), f"{f.name}: {name} parity"
+            assert all(line["surface_treatment"] and line["raw_material_price_eur_kg"] for line in streamed), (
+                f"{f.name}: {name}: header fields not attached"
+            )
+    print(f"headers-last and split-rows parity ok on {len(files)} PDFs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--folder", type=Path, default=PDF_FOLDER)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = sorted(args.folder.glob("*.pdf"))
+    if not files:
+        parser.error(f"No PDFs in {args.folder}")
+
+    with open(os.devnull, "w") as sink:
+        timings = {"legacy": [], "streaming": []}
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            legacy = [line for f in files for line in legacy_extract(f, sink)]
+            timings["legacy"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            streamed = [line for f in files for line in iter_quotes_from_pdf(f)]
+            timings["streaming"].append(time.perf_counter() - start)
+
+    assert legacy == streamed, "streaming extraction returned different lines"
+    check_parity(files)
+    best = {name: min(samples) for name, samples in timings.items()}
+    print(f"{len(files)} PDFs, {len(streamed)} lines (best of {args.repeat}, stdout to /dev/null)")
+    for name, seconds in best.items():
+        print(f"{name:>10} {seconds:>8.3f} s  {len(files) / seconds:>8.1f} PDFs/s")
+    print(f"{'speedup':>10} {best['legacy'] / best['streaming']:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_quote_parser.py
+"""Lines per second of QuoteParser vs the previous parse_quote_from_text on synthetic quote text.
+
+    python -m benchmarks.bench_quote_parser --lines 1000000
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from scripts.quote_parser import QuoteParser
+
+HEADER = ["Offert", "Datum: 2024-05-01", "Legering: EN-AW-6063", "Ytbehandling: Anodized", "Råvara: 3,30 Euro/kg"]
+
+
+def synthetic_text(n_lines: int) -> str:
+    body = (
+        f"Hörnvinkel 1,288 {20 + i % 9},6 1,2 {50000 + i % 500 * 100} 3,{10 + i % 80} RM" if i % 10 else "Summa exkl. moms"
+        for i in range(n_lines - len(HEADER))
+    )
+    return "\n".join([*HEADER, *body])
+
+
+def legacy_parse(text, source_file):
+    """parse_quote_from_text as it was before QuoteParser (logging removed)."""
+    lines = text.splitlines()
+    date_line = next(line for line in lines if "Datum:" in line)
+    quote_date = date_line.split(":")[1].strip()
+    alloy_line = next((line for line in lines if "Legering:" in line), "Legering: Rå")
+    default_alloy = alloy_line.split(":")[1].strip()
+    surface_treatment = None
+    raw_material_price_eur_kg = None
+    for line in lines:
+        if "Ytbehandling:" in line:
+            surface_treatment = line.split(":", 1)[1].strip()
+        if "Råvara:" in line:
+            match = re.search(r"([\d,]+)\s*Euro", line)
+            if match:
+                raw_material_price_eur_kg = float(match.group(1).replace(",", "."))
+
+    pattern = re.compile(
+        r"(?P<profile>[A-Za-zÅÄÖåäö\-]{3,}(?:profil)?)\s+"
+        r"(?P<weight>[\d,]+)\s+"
+        r"(?P<length>[\d,]+)\s+"
+        r"[\d,]+\s+"
+        r"(?P<quantity>\d+)\s+"
+        r"(?P<price>[\d,]+)\s+"
+        r"(?P<alloy>\w+)"
+    )
+
+    def clean_float(val):
+        return float(val.replace(",", "."))
+
+    extracted_lines = []
+    for match in pattern.finditer(text):
+        d = match.groupdict()
+        extracted_lines.append({
+            "user_id": "company_alpha",
+            "quote_id": f"{source_file.stem}_{match.start()}",
+            "quote_date": quote_date,
+            "source_file": source_file.name,
+            "profile_ref": d["profile"],
+            "weight_kg_m": clean_float(d["weight"]),
+            "length_m": clean_float(d["length"]),
+            "quantity": int(d["quantity"]),
+            "alloy": d.get("alloy") or default_alloy,
+            "quoted_price_sek": clean_float(d["price"]),
+            "tool_cost_sek": None,
+            "surface_treatment": surface_treatment,
+            "standard": None,
+            "lead_time_weeks": None,
+            "validity_date": None,
+            "raw_material_price_eur_kg": raw_material_price_eur_kg,
+        })
+    return extracted_lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = synthetic_text(args.lines)
+    source = Path("synthetic.pdf")
+    quote_parser = QuoteParser()
+
+    best = {}
+    for name, parse in (("legacy", legacy_parse), ("QuoteParser", quote_parser.parse)):
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = parse(text, source)
+            samples.append(time.perf_counter() - start)
+        best[name] = (min(samples), result)
+
+    assert best["legacy"][1] == best["QuoteParser"][1], "parsers returned different lines"
+    print(f"{args.lines:,} text lines, {len(best['legacy'][1]):,} product lines (best of {args.repeat})")
+    for name, (seconds, _) in best.items():
+        print(f"{name:>12} {seconds:>8.3f} s  {args.lines / seconds:>12,.0f} lines/s")
+    print(f"{'speedup':>12} {best['legacy'][0] / best['QuoteParser'][0]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
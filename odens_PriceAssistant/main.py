@@ -21,6 +21,8 @@ Project Structure ( ---> Initially Planned <--- ):
 """
 
 import json
+import logging
+import os
 
 # --- STEP 1: Import schema (already defined in schema/quote_training_schema.py)
 from schemas.quote_training_schema import Quote  # <- This is your core data model
@@ -36,6 +38,8 @@ from scripts.ml_model_training import run_model_training
 from scripts.predict_real_quotes import run_prediction_and_evaluation
     
 def main():
+    # Per-file progress and page text dumps are logged at INFO/DEBUG: ODENS_LOG_LEVEL=DEBUG shows them
+    logging.basicConfig(level=os.getenv("ODENS_LOG_LEVEL", "WARNING").upper(), format="%(levelname)s %(name)s: %(message)s")
     print("🚀 Starting Odens Pricing Assistant Prototype\n")
     # # In step 1 we define the schemas.
 
@@ -1,14 +1,13 @@
-import random
-from datetime import datetime, timedelta
-import json
+import os
+import uuid
+from datetime import datetime
 from pathlib import Path
-from faker import Faker
 import numpy as np
-from pandas.tseries.offsets import BDay
+import pandas as pd
 
 # Output path
-OUTPUT_PATH = Path("data/user_alpha/quotes_augmented.json")
-faker = Faker()
+# One quote per line, written batch by batch; a ".parquet" path writes one row group per batch instead
+OUTPUT_PATH = Path("data/user_alpha/quotes_augmented.ndjson")
 
 # --- Constants from your stats ---
 PROFILE_STATS = {
@@ -58,88 +57,168 @@ LME_BASE_USD_TON = 2500  # assume average LME value
 USD_TO_EUR = 0.88  # current approximate rate
 EUR_PER_KG_BASE = (LME_BASE_USD_TON / 907.185) * USD_TO_EUR  # ≈ 2.43
 
-def random_weekday_within_4_months():
-    today = datetime.today()
-    start_date = today - timedelta(days=120)
-    days_range = (today - start_date).days
-
-    while True:
-        random_days = random.randint(0, days_range)
-        quote_date = start_date + timedelta(days=random_days)
-        if quote_date.weekday() < 5:  # Mon–Fri
-            return quote_date.date()
-
-def apply_volume_discount(base_price, quantity):
-    if quantity <= 50000:
-        return base_price * 1.08
-    elif quantity <= 100000:
-        return base_price * 1.03
-    elif quantity <= 200000:
-        return base_price * 0.98
-    else:
-        return base_price * 0.95
-
-def generate_quote(profile_ref):
-    base_price = PROFILE_STATS[profile_ref]
-    quantity = (random.randint(20, 200)) * 1000
-    # quantity = random.choice([25000, 40000, 42000, 45000, 48000, 50000, 58000, 60000, 80000, 100000, 140000, 170000, 200000])
-    weight = round(np.random.normal(loc=1.2, scale=0.2), 3)
-    length = round(np.random.normal(loc=24, scale=2), 2)
-
-    alloy = random.choice(list(ALLOYS.keys()))
-    surface_treatment = random.choice(list(SURFACE_TREATMENTS.keys()))
-    raw_material_price_eur_kg = round(np.random.normal(EUR_PER_KG_BASE, 0.1), 2)
-
-    adjusted_price = base_price
-    adjusted_price *= ALLOYS[alloy]
-    adjusted_price *= SURFACE_TREATMENTS[surface_treatment]
-    adjusted_price = apply_volume_discount(adjusted_price, quantity)
-    adjusted_price = round(adjusted_price + np.random.normal(0, 0.01), 2)
-
-    return {
+# (upper quantity bound, price multiplier); larger quantities get VOLUME_DISCOUNT_TOP
+VOLUME_DISCOUNT_TIERS = [(50000, 1.08), (100000, 1.03), (200000, 0.98)]
+VOLUME_DISCOUNT_TOP = 0.95
+
+def apply_volume_discount_array(base_prices, quantities):
+    """Multiply each price by the tier of its quantity: one searchsorted over the tier bounds."""
+    bounds = np.array([upper for upper, _ in VOLUME_DISCOUNT_TIERS])
+    multipliers = np.array([m for _, m in VOLUME_DISCOUNT_TIERS] + [VOLUME_DISCOUNT_TOP])
+    return base_prices * multipliers[np.searchsorted(bounds, quantities, side="left")]
+
+# Quote fields the schema requires to be > 0 (Quote.check_positive)
+POSITIVE_FIELDS = ["quoted_price_sek", "weight_kg_m", "length_m", "quantity"]
+AUGMENT_BATCH_SIZE = 100_000
+
+def _recent_weekdays(end_date=None, days=120):
+    """Mon–Fri dates in the ``days`` days up to ``end_date``, to draw quote dates from uniformly."""
+    end = np.datetime64(end_date or datetime.today().date(), "D")
+    dates = np.arange(end - days, end + 1)
+    return dates[np.is_busday(dates)]
+
+def _uuid4_strings(rng, n):
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    return [str(uuid.UUID(bytes=row.tobytes())) for row in raw]
+
+def generate_quote_batch(n, rng, end_date=None):
+    """Draw ``n`` synthetic quotes as a DataFrame with one column per ``Quote`` field.
+
+    Drawn as NumPy arrays from ``rng`` (a ``np.random.Generator``): a uniform profile,
+    alloy and surface treatment whose multipliers set the price, a volume discount
+    by quantity tier, plus normal noise. A seeded generator and a fixed ``end_date``
+    (default: today) give the same rows every run.
+    """
+    profiles = np.array(list(PROFILE_STATS))
+    alloys = np.array(list(ALLOYS))
+    treatments = np.array(list(SURFACE_TREATMENTS))
+    profile_idx = rng.integers(len(profiles), size=n)
+    alloy_idx = rng.integers(len(alloys), size=n)
+    treatment_idx = rng.integers(len(treatments), size=n)
+
+    quantity = rng.integers(20, 201, size=n) * 1000
+    price = (
+        np.array(list(PROFILE_STATS.values()))[profile_idx]
+        * np.array(list(ALLOYS.values()))[alloy_idx]
+        * np.array(list(SURFACE_TREATMENTS.values()))[treatment_idx]
+    )
+    price = np.round(apply_volume_discount_array(price, quantity) + rng.normal(0, 0.01, size=n), 2)
+    weekdays = _recent_weekdays(end_date)
+
+    return pd.DataFrame({
         "user_id": "company_alpha",
-        "quote_id": faker.uuid4(),
-        "quote_date": str(random_weekday_within_4_months()),
+        "quote_id": _uuid4_strings(rng, n),
+        "quote_date": np.datetime_as_string(weekdays[rng.integers(len(weekdays), size=n)], unit="D"),
         "source_file": "augmented",
         "customer_id": None,
         "customer_segment": None,
-        "profile_ref": profile_ref,
-        "weight_kg_m": weight,
-        "length_m": length,
+        "profile_ref": profiles[profile_idx],
+        "weight_kg_m": np.round(rng.normal(1.2, 0.2, size=n), 3),
+        "length_m": np.round(rng.normal(24, 2, size=n), 2),
         "quantity": quantity,
-        "surface_treatment": surface_treatment,
-        "alloy": alloy,
+        "surface_treatment": treatments[treatment_idx],
+        "alloy": alloys[alloy_idx],
         "finish": None,
         "standard": None,
         "lead_time_weeks": None,
         "validity_date": None,
-        "raw_material_price_eur_kg": raw_material_price_eur_kg,
-        "quoted_price_sek": adjusted_price,
+        "raw_material_price_eur_kg": np.round(rng.normal(EUR_PER_KG_BASE, 0.1, size=n), 2),
+        "quoted_price_sek": price,
         "currency": "SEK",
         "tool_cost_sek": None,
         "is_outlier": None,
         "schema_version": "v1.0",
-        "is_valid": True
-    }
-
-def run_quote_augmentation(QuoteModel, num_examples=1000):
+        "is_valid": True,
+    })
+
+def validate_quote_batch(df, QuoteModel):
+    """Drop rows that break the schema's value rules, checked column-wise instead of per row.
+
+    The first row is also built through ``QuoteModel`` so that a column the schema does
+    not accept fails loudly instead of being written out.
+    """
+    valid = np.logical_and.reduce([df[field].to_numpy() > 0 for field in POSITIVE_FIELDS])
+    df = df[valid]
+    if len(df):
+        QuoteModel(**df.iloc[0].to_dict())
+    return df, int((~valid).sum())
+
+def iter_quote_batches(QuoteModel, num_examples, seed=None, batch_size=AUGMENT_BATCH_SIZE, end_date=None):
+    """Yield validated DataFrames of synthetic quotes until ``num_examples`` rows have been produced."""
+    rng = np.random.default_rng(seed)
+    remaining = num_examples
+    while remaining > 0:
+        batch, n_invalid = validate_quote_batch(generate_quote_batch(min(batch_size, remaining), rng, end_date), QuoteModel)
+        if n_invalid:
+            print(f"⚠️ Dropped {n_invalid} synthetic quotes that failed validation")
+        batch = batch.iloc[:remaining]
+        remaining -= len(batch)
+        yield batch
+
+class QuoteBatchWriter:
+    """Append quote batches to NDJSON or (by file suffix) Parquet without holding earlier batches.
+
+    Rows go to a temporary file that replaces ``path`` on ``close()``, so readers never
+    see a half-written dataset.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.parquet = self.path.suffix == ".parquet"
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, batch):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                table = pa.Table.from_pandas(batch, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(batch, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = open(self.tmp_path, "w", encoding="utf-8")
+            text = batch.to_json(orient="records", lines=True, force_ascii=False)
+            self._file.write(text if text.endswith("\n") else text + "\n")
+        self.rows += len(batch)
+
+    def _close_files(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+    def close(self):
+        self._close_files()
+        if self._writer is None and self._file is None:
+            self.tmp_path.touch()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Drop the partial output and leave any previous ``path`` in place."""
+        self._close_files()
+        self.tmp_path.unlink(missing_ok=True)
+
+def run_quote_augmentation(QuoteModel, num_examples=1000, seed=None, batch_size=AUGMENT_BATCH_SIZE, end_date=None, output_path=None):
     print("📈 Generating synthetic quote dataset...")
-    augmented = []
-
-    profiles = list(PROFILE_STATS.keys())
-
-    while len(augmented) < num_examples:
-        profile = random.choice(profiles)
-        quote_dict = generate_quote(profile)
-
-        try:
-            quote = QuoteModel(**quote_dict)
-            augmented.append(quote.model_dump(mode="json"))
-        except Exception as e:
-            print(f"⚠️ Validation failed for {quote_dict['quote_id']}: {e}")
-
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(augmented, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Saved {len(augmented)} synthetic quotes to {OUTPUT_PATH}")
\ No newline at end of file
+    output_path = Path(output_path or OUTPUT_PATH)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    writer = QuoteBatchWriter(output_path)
+    try:
+        for batch in iter_quote_batches(QuoteModel, num_examples, seed, batch_size, end_date):
+            writer.write(batch)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    print(f"✅ Saved {writer.rows} synthetic quotes to {output_path}")
@@ -1,15 +1,17 @@
 # scripts/extract_features.py
 
 import json
+import os
 import pandas as pd
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional
 from sklearn.preprocessing import OneHotEncoder
-from schemas.quote_training_schema import QuoteML
 
 # Input and output paths
-INPUT_PATH = Path("data/user_alpha/quotes_augmented.json")
+INPUT_PATH = Path("data/user_alpha/quotes_augmented.ndjson")
 OUTPUT_PATH = Path("data/user_alpha/quotes_features.csv")
+# Rows read, validated and encoded at a time; peak memory is bounded by this, not the dataset size
+FEATURE_CHUNK_ROWS = 100_000
 
 # Selected features for ML model
 ML_FEATURES = [
@@ -22,49 +24,95 @@ ML_FEATURES = [
     "raw_material_price_eur_kg",
     "quoted_price_sek"
 ]
+CATEGORICAL_COLUMNS = ["profile_ref", "surface_treatment", "alloy"]
 
-def load_valid_quotes(path: Path) -> List[dict]:
-    """Load and validate quotes using QuoteML schema."""
-    with open(path, encoding="utf-8") as f:
-        raw_quotes = json.load(f)
+def iter_quote_chunks(path: Path, chunk_rows: int = FEATURE_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield the ML_FEATURES columns of augmented quotes, ``chunk_rows`` rows at a time.
 
-    valid_quotes = []
-    for idx, item in enumerate(raw_quotes, start=1):
-        try:
-            validated = QuoteML(**item)
-            valid_quotes.append(validated.model_dump())
-            if idx % 200 == 0:
-                print(f"✅ Validated entry number {idx} to adhere to QuoteML schema.")
-        except Exception as e:
-            print(f"⚠️ Skipping invalid entry: {e}")
+    Reads NDJSON in line chunks and Parquet in record batches (only the needed columns).
+    A legacy JSON array file is still accepted, but has to be loaded whole.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
 
-    return valid_quotes
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=ML_FEATURES):
+            yield batch.to_pandas()
+    elif path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            df = pd.DataFrame(json.load(f)).reindex(columns=ML_FEATURES)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        with pd.read_json(path, lines=True, chunksize=chunk_rows, dtype=False, convert_dates=False) as reader:
+            for chunk in reader:
+                yield chunk.reindex(columns=ML_FEATURES)
 
-def encode_categoricals(df: pd.DataFrame, categorical_cols: List[str]) -> pd.DataFrame:
-    """One-hot encode specified categorical columns."""
-    encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+def validate_quote_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep the rows that satisfy the QuoteML schema, checked column-wise.
+
+    Every field is required, numeric fields must be numbers and quantity a whole number.
+    """
+    df = df.copy()
+    for col in ML_FEATURES:
+        if col not in CATEGORICAL_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    valid = df.notna().all(axis=1) & (df["quantity"] % 1 == 0)
+    df = df[valid]
+    return df.astype({"quantity": "int64", **{col: str for col in CATEGORICAL_COLUMNS}})
+
+def iter_valid_quotes(path: Path, chunk_rows: int = FEATURE_CHUNK_ROWS, verbose: bool = False) -> Iterator[pd.DataFrame]:
+    """Validated chunks of quotes adhering to the QuoteML schema."""
+    seen = 0
+    for chunk in iter_quote_chunks(path, chunk_rows):
+        valid = validate_quote_chunk(chunk)
+        seen += len(chunk)
+        if verbose:
+            print(f"✅ Validated {seen} entries to adhere to QuoteML schema.")
+            if len(valid) < len(chunk):
+                print(f"⚠️ Skipping {len(chunk) - len(valid)} invalid entries")
+        yield valid
+
+def collect_categories(path: Path, categorical_cols: List[str], chunk_rows: int = FEATURE_CHUNK_ROWS) -> List[list]:
+    """Sorted categories per column over the whole file, so every chunk is encoded with the same columns."""
+    values = {col: set() for col in categorical_cols}
+    for chunk in iter_valid_quotes(path, chunk_rows):
+        for col in categorical_cols:
+            values[col].update(chunk[col].unique())
+    return [sorted(values[col]) for col in categorical_cols]
+
+def encode_categoricals(df: pd.DataFrame, categorical_cols: List[str], categories: Optional[List[list]] = None) -> pd.DataFrame:
+    """One-hot encode specified categorical columns, with fixed ``categories`` when encoding in chunks."""
+    encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore', categories=categories or "auto")
     encoded = encoder.fit_transform(df[categorical_cols])
     encoded_df = pd.DataFrame(encoded, columns=encoder.get_feature_names_out(categorical_cols))
     df = df.drop(columns=categorical_cols).reset_index(drop=True)
     df_encoded = pd.concat([df, encoded_df], axis=1)
     return df_encoded
 
-def run_feature_extraction() -> pd.DataFrame:
-    """Main feature extraction routine."""
-    print("🔍 Step 7: Loading and validating augmented quotes...")
-    quotes = load_valid_quotes(INPUT_PATH)
-
-    print(f"✅ Loaded {len(quotes)} valid quotes.")
-    df = pd.DataFrame(quotes)[ML_FEATURES]
-    df = df.dropna(subset=ML_FEATURES)
+def run_feature_extraction(input_path: Path = INPUT_PATH, chunk_rows: int = FEATURE_CHUNK_ROWS, preview_rows: int = 5) -> pd.DataFrame:
+    """Main feature extraction routine.
 
-    print(f"📊 Encoding features from {len(df)} entries...")
-    categorical_cols = ["profile_ref", "surface_treatment", "alloy"]
-    df_encoded = encode_categoricals(df, categorical_cols)
+    Streams the augmented quotes twice: once to collect the categories, once to encode
+    and append each chunk to the CSV. Returns the first ``preview_rows`` encoded rows.
+    """
+    print("🔍 Step 7: Collecting categories from augmented quotes...")
+    categories = collect_categories(input_path, CATEGORICAL_COLUMNS, chunk_rows)
 
-    # Save to CSV
+    print(f"📊 Encoding features in chunks of {chunk_rows} rows...")
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    df_encoded.to_csv(OUTPUT_PATH, index=False)
-    print(f"✅ Features saved to {OUTPUT_PATH}")
+    tmp_path = OUTPUT_PATH.with_name(OUTPUT_PATH.name + ".tmp")
+    preview, n_rows = None, 0
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        for chunk in iter_valid_quotes(input_path, chunk_rows, verbose=True):
+            if chunk.empty:
+                continue
+            df_encoded = encode_categoricals(chunk, CATEGORICAL_COLUMNS, categories)
+            df_encoded.to_csv(f, index=False, header=n_rows == 0)
+            if preview is None:
+                preview = df_encoded.head(preview_rows)
+            n_rows += len(df_encoded)
+    os.replace(tmp_path, OUTPUT_PATH)
 
-    return df_encoded
+    print(f"✅ Features of {n_rows} valid quotes saved to {OUTPUT_PATH}")
+    return preview if preview is not None else pd.DataFrame()
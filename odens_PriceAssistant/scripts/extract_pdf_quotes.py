@@ -1,127 +1,185 @@
 # scripts/extract_pdf_quotes.py
 
+import hashlib
+import logging
+import os
+import time
 import pdfplumber
-import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
+from functools import partial
+from scripts.quote_parser import ODENS_LAYOUT, get_parser, resolve_layout
 
 # Paths
 PDF_FOLDER = Path("data/user_alpha/originial_Quotes_data")
 OUTPUT_PATH = Path("data/user_alpha/quotes_extracted.json")
+# Per-PDF content hash, extracted lines, timing and error of the last extraction
+MANIFEST_PATH = Path("data/user_alpha/pdf_manifest.json")
+MANIFEST_VERSION = 2
 
-def extract_text_from_pdf(file_path):
-    """Extract all text from a multi-page PDF."""
-    print("Entered step 1")
-    with pdfplumber.open(file_path) as pdf:
-        return "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
+logger = logging.getLogger(__name__)
 
-def parse_quote_from_text(text, source_file):
-    """Extract all product lines from a single quote PDF and attach shared metadata."""
-    lines = text.splitlines()
+def iter_pdf_pages(file_path):
+    """Yield the text of each non-empty page lazily, extracting every page once."""
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            page.close()  # drop the page's cached layout objects
+            if text:
+                yield text
 
+def extract_text_from_pdf(file_path):
+    """Extract all text from a multi-page PDF."""
+    return "\n".join(iter_pdf_pages(file_path))
+
+def iter_quotes_from_pages(pages, file_path, layout=ODENS_LAYOUT):
+    """Parse each page's product lines as soon as it arrives; only parsed lines outlive their page.
+
+    A page's last line is held back and parsed with the next page, so a product line
+    broken by the page break is still found. The header fields may sit on any page, so
+    they are scanned from every page and attached after the last one. ``quote_id``
+    offsets are counted in the joined text, as in ``parse_quote_from_text``.
+    """
+    parser = get_parser(layout)
+    file_path = Path(file_path)
+    header_lines, lines = [], []
+    carry, offset = None, 0  # unparsed tail of the previous page, and its position in the joined text
+    for page_no, text in enumerate(pages, start=1):
+        logger.debug("%s, page %d:\n%s", file_path.name, page_no, text)
+        header_lines.extend(parser.header_lines(text))
+        if carry is not None:
+            text = carry + "\n" + text
+        cut = parser.carry_start(text)
+        lines.extend(parser.parse_lines(text[:cut], file_path, offset=offset))
+        carry, offset = text[cut:], offset + cut
+    if carry:
+        lines.extend(parser.parse_lines(carry, file_path, offset=offset))
+    header = parser.read_header(header_lines, file_path)
+    if header is None:
+        return
+    yield from parser.attach_header(lines, header)
+
+def iter_quotes_from_pdf(file_path, layout=ODENS_LAYOUT):
+    """Stream the product lines of one PDF, extracting each page once."""
+    return iter_quotes_from_pages(iter_pdf_pages(file_path), file_path, layout)
+
+def parse_quote_from_text(text, source_file, header_lines=None, offset=0, layout=ODENS_LAYOUT):
+    """Extract all product lines from a single quote PDF and attach shared metadata.
+
+    ``header_lines`` supplies the shared fields when ``text`` is only part of the PDF,
+    and ``offset`` is the position of ``text`` within the whole PDF's text.
+    """
+    return get_parser(layout).parse(text, source_file, header_lines, offset)
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extract_pdf_file(path, layout=ODENS_LAYOUT):
+    """Extract and parse one PDF; runs in a worker process and never raises.
+
+    ``layout`` is the ``QuoteLayout`` itself rather than its name: a layout registered in
+    the parent does not exist in spawn-started workers.
+    """
+    path = Path(path)
+    start = time.perf_counter()
+    entry = {"file": path.name, "sha256": None, "layout": layout.name, "lines": [], "error": None}
     try:
-        # --- Shared metadata ---
-        date_line = next(line for line in lines if "Datum:" in line)
-        quote_date = date_line.split(":")[1].strip()
-
-        alloy_line = next((line for line in lines if "Legering:" in line), "Legering: Rå")
-        default_alloy = alloy_line.split(":")[1].strip()
-
-        # Optional shared fields
-        tool_cost_sek = None
-        surface_treatment = None
-        standard = None
-        lead_time_weeks = None
-        validity_date = None
-        raw_material_price_eur_kg = None
-
-        for line in lines:
-            # if "Verktygskostnad:" in line:
-            #     match = re.search(r"(\d+)\s*kr", line.replace(" ", ""))
-            #     if match:
-            #         tool_cost_sek = float(match.group(1))
-
-            if "Ytbehandling:" in line:
-                surface_treatment = line.split(":", 1)[1].strip()
-
-            if "Råvara:" in line:
-                match = re.search(r"([\d,]+)\s*Euro", line)
-                if match:
-                    raw_material_price_eur_kg = float(match.group(1).replace(",", "."))
-
-        # --- Extract product lines ---
-        extracted_lines = []
-        pattern = re.compile(
-            r"(?P<profile>[A-Za-zÅÄÖåäö\-]{3,}(?:profil)?)\s+"
-            r"(?P<weight>[\d,]+)\s+"
-            r"(?P<length>[\d,]+)\s+"
-            r"[\d,]+\s+"
-            r"(?P<quantity>\d+)\s+"
-            r"(?P<price>[\d,]+)\s+"
-            r"(?P<alloy>\w+)"
-        )
-
-        def clean_float(val):
-            return float(val.replace(",", "."))
-
-        for match in pattern.finditer(text):
-            try:
-                d = match.groupdict()
-
-                quote_data = {
-                    "user_id": "company_alpha",
-                    "quote_id": f"{source_file.stem}_{match.start()}",
-                    "quote_date": quote_date,
-                    "source_file": source_file.name,
-                    "profile_ref": d["profile"],
-                    "weight_kg_m": clean_float(d["weight"]),
-                    "length_m": clean_float(d["length"]),
-                    "quantity": int(d["quantity"]),
-                    "alloy": d.get("alloy") or default_alloy,
-                    "quoted_price_sek": clean_float(d["price"]),
-                    "tool_cost_sek": tool_cost_sek,
-                    "surface_treatment": surface_treatment,
-                    "standard": standard,
-                    "lead_time_weeks": lead_time_weeks,
-                    "validity_date": validity_date,
-                    "raw_material_price_eur_kg": raw_material_price_eur_kg
-                }
-
-                extracted_lines.append(quote_data)
-
-            except Exception as e:
-                print(f"⚠️ Failed to extract one line in {source_file.name}: {e}")
-
-        return extracted_lines
-
+        entry["sha256"] = file_sha256(path)
+        entry["lines"] = list(iter_quotes_from_pdf(path, layout))
     except Exception as e:
-        print(f"❌ Error parsing shared fields in {source_file.name}: {e}")
-        return []
-
-def run_pdf_extraction(QuoteModel):
-    """Main function to extract and validate quotes from all PDFs."""
-    extracted = []
-
-    for file in sorted(PDF_FOLDER.glob("PdfNAP (*.pdf")):  # To process all 50 PDFs
-        print(f"📄 Processing: {file.name}")
-        text = extract_text_from_pdf(file)
-        print("Extracted Text starts here\n")
-        print(text)
-        print("Extracted Text ends here\n")
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - start, 4)
+    return entry
 
-        all_quote_lines = parse_quote_from_text(text, file)
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+def save_manifest(files, path=MANIFEST_PATH):
+    """Write the manifest to a temp file and rename it over the old one, so a crash never leaves it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _is_unchanged(entry, stat, retry_failed):
+    # Size + mtime match: trust the stored hash instead of re-reading the file
+    if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+        return False
+    return not (retry_failed and entry["error"])
+
+def extract_changed_pdfs(files, manifest, workers=None, retry_failed=False, layout=ODENS_LAYOUT):
+    """Re-extract PDFs whose content changed since the manifest was written; returns the updated manifest.
+
+    A file whose size or mtime changed is re-hashed first, and only parsed again if its
+    content hash differs too. Parsing fans out over a process pool.
+    """
+    layout = resolve_layout(layout)
+    updated, changed = {}, []
+    for file in files:
+        stat = file.stat()
+        entry = manifest.get(file.name)
+        if entry is not None and entry["layout"] != layout.name:
+            entry = None
+        if _is_unchanged(entry, stat, retry_failed):
+            updated[file.name] = entry
+        elif entry is not None and not entry["error"] and entry["sha256"] == file_sha256(file):
+            updated[file.name] = {**entry, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        else:
+            changed.append((file, stat))
+
+    if changed:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, min(32, len(changed) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(partial(extract_pdf_file, layout=layout), [file for file, _ in changed], chunksize=chunksize)
+            for (file, stat), entry in zip(changed, results):
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, extracted_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+                updated[file.name] = entry
+                if entry["error"]:
+                    logger.warning("Failed to extract %s: %s", file.name, entry["error"])
+                else:
+                    logger.info("Processed %s (%d lines, %.2f s)", file.name, len(entry["lines"]), entry["seconds"])
+    return updated, len(changed)
+
+def run_pdf_extraction(QuoteModel, workers=None, force=False, retry_failed=False, layout=ODENS_LAYOUT):
+    """Main function to extract and validate quotes from all PDFs.
+
+    Only PDFs that are new or changed since the last run are parsed (in parallel);
+    the others reuse the lines cached in ``MANIFEST_PATH``. ``force`` ignores the manifest.
+    ``layout`` is a ``QuoteLayout`` or the name of a registered one.
+    """
+    files = sorted(PDF_FOLDER.glob("PdfNAP (*.pdf"))  # To process all 50 PDFs
+    manifest = {} if force else load_manifest()
+    entries, n_extracted = extract_changed_pdfs(files, manifest, workers, retry_failed, layout)
+    save_manifest(entries)
 
-        for quote_data in all_quote_lines:
+    extracted = []
+    for file in files:
+        for quote_data in entries[file.name]["lines"]:
             try:
                 quote = QuoteModel(**quote_data)
                 extracted.append(quote.model_dump(mode="json"))
-                print(f"✅ Validated and added: {quote_data['quote_id']}")
             except Exception as e:
-                print(f"❌ Validation failed for {quote_data.get('quote_id', 'unknown')}: {e}")
+                logger.warning("Validation failed for %s: %s", quote_data.get("quote_id", "unknown"), e)
 
     # Save all valid quotes
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
         json.dump(extracted, f, indent=2, ensure_ascii=False)
 
-    print(f"\n✅ Extraction complete. Saved {len(extracted)} quotes to {OUTPUT_PATH}")
\ No newline at end of file
+    n_failed = sum(1 for entry in entries.values() if entry["error"])
+    print(f"\n📦 PDFs: {n_extracted} extracted, {len(files) - n_extracted} unchanged (cached), {n_failed} failed")
+    print(f"✅ Extraction complete. Saved {len(extracted)} quotes to {OUTPUT_PATH}")
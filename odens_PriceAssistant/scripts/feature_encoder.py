@@ -0,0 +1,85 @@
+# scripts/feature_encoder.py
+# Keep in sync with odens_Backend/services/feature_encoder.py so that
+# training-side evaluation and the API build identical feature vectors.
+from typing import Iterable, List, Mapping, Optional
+
+import numpy as np
+
+CATEGORICAL_FIELDS = ("profile_ref", "surface_treatment", "alloy")
+
+
+class FeatureEncoder:
+    """One-hot encoder compiled from a model's ``features_used`` list.
+
+    Produces the same columns as ``pd.get_dummies`` followed by aligning to
+    ``features_used``: numeric fields are copied, ``<field>_<value>`` columns are
+    set to 1 and categories unseen during training leave every column at 0.
+    """
+
+    def __init__(self, features_used: List[str], dtype=np.float32):
+        self.features_used = list(features_used)
+        self.width = len(self.features_used)
+        self.dtype = dtype
+        self.numeric_index = {}
+        self.category_index = {field: {} for field in CATEGORICAL_FIELDS}
+
+        for idx, name in enumerate(self.features_used):
+            field = next((f for f in CATEGORICAL_FIELDS if name.startswith(f + "_")), None)
+            if field is None:
+                self.numeric_index[name] = idx
+            else:
+                self.category_index[field][name[len(field) + 1:]] = idx
+
+    @classmethod
+    def from_metadata(cls, meta: dict, dtype=np.float32) -> "FeatureEncoder":
+        return cls(meta["features_used"], dtype=dtype)
+
+    def empty(self, n_rows: int) -> np.ndarray:
+        return np.zeros((n_rows, self.width), dtype=self.dtype)
+
+    def encode_row(self, record: Mapping, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode one quote into ``out`` (a zeroed 1-D row), allocating it if not given."""
+        row = np.zeros(self.width, dtype=self.dtype) if out is None else out
+        for field, idx in self.numeric_index.items():
+            value = record.get(field)
+            row[idx] = np.nan if value is None else value
+        for field, index in self.category_index.items():
+            idx = index.get(record.get(field))
+            if idx is not None:
+                row[idx] = 1
+        return row
+
+    def encode(self, records: Iterable[Mapping], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode many quotes into a ``(n, len(features_used))`` matrix, column by column."""
+        records = records if isinstance(records, list) else list(records)
+        n = len(records)
+        if out is None:
+            out = self.empty(n)
+        else:
+            out[:n] = 0
+
+        rows = np.arange(n)
+        for field, idx in self.numeric_index.items():
+            out[:n, idx] = [record.get(field) for record in records]
+        for field, index in self.category_index.items():
+            cols = np.fromiter((index.get(record.get(field), -1) for record in records), dtype=np.intp, count=n)
+            hit = cols >= 0
+            out[rows[hit], cols[hit]] = 1
+        return out[:n]
+
+    def encode_grid(self, record: Mapping, grid: Mapping[str, Iterable]) -> np.ndarray:
+        """Encode the Cartesian product of ``record`` with numeric ``grid`` values.
+
+        Rows follow ``itertools.product`` order over the grid fields (last field varies
+        fastest), so predictions reshape to ``[len(values) for values in grid.values()]``.
+        """
+        base = self.encode_row(record)
+        axes = [np.asarray(values, dtype=self.dtype) for values in grid.values()]
+        shape = [len(axis) for axis in axes]
+        out = np.tile(base, (int(np.prod(shape)), 1))
+        mesh = np.meshgrid(*axes, indexing="ij") if axes else []
+        for field, values in zip(grid, mesh):
+            idx = self.numeric_index.get(field)
+            if idx is not None:
+                out[:, idx] = values.ravel()
+        return out
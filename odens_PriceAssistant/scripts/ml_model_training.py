@@ -1,7 +1,9 @@
 # scripts/ml_model_training.py
 
 import json
+from datetime import date
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 import xgboost as xgb
 from sklearn.model_selection import cross_val_score, KFold
@@ -9,16 +11,86 @@ from sklearn.metrics import root_mean_squared_error, r2_score, mean_absolute_per
 import optuna
 import time
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 # Paths
 INPUT_FEATURES = Path("data/user_alpha/quotes_features.csv")
 MODEL_OUTPUT = Path("models/user_alpha/xgboost_model.json")
 METADATA_OUTPUT = Path("models/user_alpha/model_metadata.json")
 
-
-def load_dataset():
-    df = pd.read_csv(INPUT_FEATURES)
-    X = df.drop(columns=["quoted_price_sek"])
-    y = df["quoted_price_sek"]
+# Saved quotes from before the backend switched to Parquet, next to its quotes/ store
+LEGACY_CSV = "quotes_features.csv"
+
+# Raw columns needed from the backend's partitioned quote store (data/{user}/quotes/date=YYYY-MM-DD/)
+NUMERIC_COLUMNS = ["weight_kg_m", "length_m", "quantity", "raw_material_price_eur_kg"]
+CATEGORICAL_COLUMNS = ["profile_ref", "surface_treatment", "alloy"]
+TARGET_COLUMN = "quoted_price_sek"
+
+
+def _read_legacy_csv(path: Path, columns) -> pd.DataFrame:
+    try:
+        return pd.read_csv(path, usecols=columns, encoding="utf-8")
+    except UnicodeDecodeError:
+        # Older files were written with the platform default encoding (cp1252 on Windows)
+        return pd.read_csv(path, usecols=columns, encoding="latin-1")
+
+
+def read_partitioned_quotes(path: Path, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+    """Read only the training columns from date partitions in [start, end] of a saved-quote store.
+
+    Matches the backend's ``database.quote_store.read_quotes``: the user's legacy
+    ``quotes_features.csv`` next to the store comes first unless ``start`` is given,
+    files left behind by an interrupted compaction are skipped, and the store's
+    ``.lock`` is held shared so a running compaction is never read half done.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    path = Path(path)
+    columns = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + [TARGET_COLUMN]
+    frames = []
+    legacy_csv = path.parent / LEGACY_CSV
+    if start is None and legacy_csv.exists():
+        frames.append(_read_legacy_csv(legacy_csv, columns)[columns])
+
+    first, last = start and start.isoformat(), end and end.isoformat()
+    with open(path / ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_SH)
+        files = []
+        for partition in sorted(p for p in path.iterdir() if p.is_dir()):
+            day = partition.name.partition("=")[2]
+            if (first and day < first) or (last and day > last):
+                continue
+            superseded = set()
+            journal = partition / "_compaction.json"
+            if journal.exists():
+                entry = json.loads(journal.read_text())
+                if (partition / entry["merged"]).exists():
+                    superseded = set(entry["inputs"])
+            files.extend(
+                str(p) for p in sorted(partition.glob("*.parquet"))
+                if not p.name.startswith(".") and p.name not in superseded
+            )
+        if files:
+            partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+            dataset = ds.dataset(files, format="parquet", partitioning=partitioning, partition_base_dir=str(path))
+            frames.append(dataset.to_table(columns=columns).to_pandas())
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def load_dataset(source: Path = INPUT_FEATURES, start: Optional[date] = None, end: Optional[date] = None):
+    """Load X, y from the encoded features CSV, or from a partitioned quote store directory."""
+    if Path(source).is_dir():
+        raw = read_partitioned_quotes(source, start, end)
+        df = pd.get_dummies(raw, columns=CATEGORICAL_COLUMNS, dtype=float)
+    else:
+        df = pd.read_csv(source)
+    X = df.drop(columns=[TARGET_COLUMN])
+    y = df[TARGET_COLUMN]
     return X, y
 
 
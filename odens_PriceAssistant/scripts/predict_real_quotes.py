@@ -4,9 +4,9 @@ import json
 import pandas as pd
 import xgboost as xgb
 from pathlib import Path
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.metrics import root_mean_squared_error, mean_absolute_percentage_error, r2_score
 from schemas.quote_training_schema import QuoteML
+from scripts.feature_encoder import FeatureEncoder
 
 # Paths
 REAL_QUOTES_PATH = Path("data/user_alpha/quotes_extracted.json")
@@ -31,22 +31,11 @@ def prepare_features(df: pd.DataFrame, metadata: dict) -> pd.DataFrame:
     y_true = df["quoted_price_sek"].values
     X = df.drop(columns=["quoted_price_sek"])
 
-    cat_cols = ["profile_ref", "surface_treatment", "alloy"]
-    encoder = OneHotEncoder(sparse_output=False, handle_unknown="ignore")
-    encoder.fit(pd.DataFrame([{col: val} for col in cat_cols for val in metadata["features_used"] if col in val]))
+    # Same encoder as the backend API, so evaluation sees the vectors production sees
+    encoder = FeatureEncoder.from_metadata(metadata)
+    encoded = encoder.encode(X.to_dict("records"))
 
-    encoded = encoder.transform(X[cat_cols])
-    encoded_df = pd.DataFrame(encoded, columns=encoder.get_feature_names_out(cat_cols))
-
-    X = X.drop(columns=cat_cols).reset_index(drop=True)
-    df_features = pd.concat([X, encoded_df], axis=1)
-
-    # Ensure all training features exist
-    for col in metadata["features_used"]:
-        if col not in df_features.columns:
-            df_features[col] = 0.0
-
-    df_features = df_features[metadata["features_used"]]  # align order
+    df_features = pd.DataFrame(encoded, columns=metadata["features_used"])
     return df_features, y_true
 
 def run_prediction_and_evaluation():
@@ -0,0 +1,214 @@
+# scripts/quote_parser.py
+"""Reusable parser for the text of supplier quote PDFs.
+
+A ``QuoteLayout`` describes one supplier's format: the header markers and the
+product-line regex. ``QuoteParser`` compiles a layout once and then parses any number
+of quotes. Header lines are found with a single regex pass over the text, and the
+product lines with one more. Register other suppliers' formats with ``register_layout``.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ODENS_LINE_PATTERN = (
+    r"(?P<profile>[A-Za-zÅÄÖåäö\-]{3,}(?:profil)?)\s+"
+    r"(?P<weight>[\d,]+)\s+"
+    r"(?P<length>[\d,]+)\s+"
+    r"[\d,]+\s+"
+    r"(?P<quantity>\d+)\s+"
+    r"(?P<price>[\d,]+)\s+"
+    r"(?P<alloy>\w+)"
+)
+
+LINE_GROUPS = ("profile", "weight", "length", "quantity", "price", "alloy")
+
+
+def _comma_decimal(value: str) -> float:
+    return float(value.replace(",", "."))
+
+
+def _point_decimal(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+@dataclass(frozen=True)
+class QuoteLayout:
+    """Header markers and product-line regex of one supplier's quote PDFs.
+
+    ``line_pattern`` must define the named groups in ``LINE_GROUPS``;
+    ``raw_material_pattern`` captures the price in its first group. ``decimal_comma``
+    reads "3,30" as 3.3; otherwise commas are thousands separators.
+    """
+
+    name: str
+    line_pattern: str = ODENS_LINE_PATTERN
+    date_marker: str = "Datum:"
+    alloy_marker: str = "Legering:"
+    surface_marker: str = "Ytbehandling:"
+    raw_material_marker: str = "Råvara:"
+    raw_material_pattern: str = r"([\d,]+)\s*Euro"
+    default_alloy: str = "Rå"
+    decimal_comma: bool = True
+
+    @property
+    def header_markers(self) -> tuple:
+        return (self.date_marker, self.alloy_marker, self.surface_marker, self.raw_material_marker)
+
+
+ODENS_LAYOUT = QuoteLayout(name="odens")
+LAYOUTS = {ODENS_LAYOUT.name: ODENS_LAYOUT}
+
+
+def register_layout(layout: QuoteLayout):
+    if layout.name in LAYOUTS and LAYOUTS[layout.name] != layout:
+        raise ValueError(f"Layout '{layout.name}' is already registered")
+    LAYOUTS[layout.name] = layout
+
+
+class QuoteParser:
+    """Parses quote text in one ``QuoteLayout``; patterns are compiled once per parser."""
+
+    def __init__(self, layout: QuoteLayout = ODENS_LAYOUT, user_id: str = "company_alpha"):
+        self.layout = layout
+        self.user_id = user_id
+        self.to_float = _comma_decimal if layout.decimal_comma else _point_decimal
+        self.line_re = re.compile(layout.line_pattern)
+        self.raw_material_re = re.compile(layout.raw_material_pattern)
+        markers = "|".join(re.escape(marker) for marker in layout.header_markers)
+        self.header_line_re = re.compile(rf"^.*(?:{markers}).*$", re.MULTILINE)
+
+    def header_lines(self, text: str) -> list:
+        """The lines of ``text`` that contain a header marker, found in one regex pass."""
+        return self.header_line_re.findall(text)
+
+    def scan_header(self, lines) -> dict:
+        """Collect every header field from ``lines`` in one pass.
+
+        The first date and alloy lines win; for surface treatment and raw material price
+        the last occurrence does. Each value is the text after its marker, so markers need
+        not end in a colon. ``quote_date`` is None when there is no date line; a raw
+        material price that is not a number raises ``ValueError``.
+        """
+        layout = self.layout
+        header = {
+            "quote_date": None,
+            "default_alloy": None,
+            "surface_treatment": None,
+            "raw_material_price_eur_kg": None,
+        }
+        for line in lines:
+            if header["quote_date"] is None and layout.date_marker in line:
+                header["quote_date"] = line.split(layout.date_marker, 1)[1].strip()
+            if header["default_alloy"] is None and layout.alloy_marker in line:
+                header["default_alloy"] = line.split(layout.alloy_marker, 1)[1].strip()
+            if layout.surface_marker in line:
+                header["surface_treatment"] = line.split(layout.surface_marker, 1)[1].strip()
+            if layout.raw_material_marker in line:
+                match = self.raw_material_re.search(line)
+                if match:
+                    header["raw_material_price_eur_kg"] = self.to_float(match.group(1))
+        if header["default_alloy"] is None:
+            header["default_alloy"] = layout.default_alloy
+        return header
+
+    def parse_lines(self, text: str, source_file: Path, header: dict = None, offset: int = 0) -> list:
+        """Product lines of ``text`` with the shared ``header`` fields attached.
+
+        Without ``header`` the shared fields are left for ``attach_header``.
+        """
+        to_float = self.to_float
+        stem, name = source_file.stem, source_file.name
+        header = header or {}
+        quote_date, default_alloy = header.get("quote_date"), header.get("default_alloy")
+        surface_treatment, raw_material_price = header.get("surface_treatment"), header.get("raw_material_price_eur_kg")
+        extracted_lines = []
+        for match in self.line_re.finditer(text):
+            profile, weight, length, quantity, price, alloy = match.group(*LINE_GROUPS)
+            try:
+                extracted_lines.append({
+                    "user_id": self.user_id,
+                    "quote_id": f"{stem}_{offset + match.start()}",
+                    "quote_date": quote_date,
+                    "source_file": name,
+                    "profile_ref": profile,
+                    "weight_kg_m": to_float(weight),
+                    "length_m": to_float(length),
+                    "quantity": int(quantity),
+                    "alloy": alloy or default_alloy,
+                    "quoted_price_sek": to_float(price),
+                    "tool_cost_sek": None,
+                    "surface_treatment": surface_treatment,
+                    "standard": None,
+                    "lead_time_weeks": None,
+                    "validity_date": None,
+                    "raw_material_price_eur_kg": raw_material_price,
+                })
+            except Exception as e:
+                logger.warning("Failed to extract one line in %s: %s", name, e)
+        return extracted_lines
+
+    def carry_start(self, text: str) -> int:
+        """Where the unfinished tail of a page starts: its last line, or earlier if a product line runs into it.
+
+        A product line broken by the page break only matches once the next page's text
+        follows, so everything from here on is parsed together with that page.
+        """
+        last_line = text.rfind("\n") + 1
+        for match in self.line_re.finditer(text):
+            if match.end() >= last_line:
+                return min(match.start(), last_line)
+        return last_line
+
+    @staticmethod
+    def attach_header(lines: list, header: dict) -> list:
+        """Fill the shared ``header`` fields into lines parsed without one."""
+        for line in lines:
+            line["quote_date"] = header["quote_date"]
+            line["alloy"] = line["alloy"] or header["default_alloy"]
+            line["surface_treatment"] = header["surface_treatment"]
+            line["raw_material_price_eur_kg"] = header["raw_material_price_eur_kg"]
+        return lines
+
+    def parse(self, text: str, source_file: Path, header_lines=None, offset: int = 0) -> list:
+        """Extract all product lines from a quote's text and attach its shared metadata.
+
+        ``header_lines`` supplies the shared fields when ``text`` is only part of the PDF,
+        and ``offset`` is the position of ``text`` within the whole PDF's text.
+        """
+        source_file = Path(source_file)
+        header = self.read_header(self.header_lines(text) if header_lines is None else header_lines, source_file)
+        if header is None:
+            return []
+        return self.parse_lines(text, source_file, header, offset)
+
+    def read_header(self, lines, source_file: Path):
+        """``scan_header``, or None with a warning when the date is missing or a field is malformed."""
+        try:
+            header = self.scan_header(lines)
+        except ValueError as e:
+            logger.warning("Error parsing shared fields in %s: %s", source_file.name, e)
+            return None
+        if header["quote_date"] is None:
+            logger.warning("Error parsing shared fields in %s: no '%s' line", source_file.name, self.layout.date_marker)
+            return None
+        return header
+
+
+_parsers = {}
+
+
+def resolve_layout(layout) -> QuoteLayout:
+    """A ``QuoteLayout`` as is, or the registered layout of that name."""
+    return LAYOUTS[layout] if isinstance(layout, str) else layout
+
+
+def get_parser(layout=ODENS_LAYOUT) -> QuoteParser:
+    """Shared parser for a layout (or registered layout name), compiled on first use in this process."""
+    layout = resolve_layout(layout)
+    parser = _parsers.get(layout)
+    if parser is None:
+        parser = _parsers[layout] = QuoteParser(layout)
+    return parser